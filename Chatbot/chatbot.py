@@ -1,169 +1,879 @@
 import random
 import datetime
+import re
+import string
+import itertools
+import json
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from metrics import metrics
 
 # =============================================================================
-# 1. DATA STRUCTURES (INTENTS & RULES)
+# 1. LOADING INTENTS (RULES)
 # =============================================================================
-# This dictionary stores all the rules for our chatbot.
+# The rules for our chatbot live in intents.json next to this script, so they
+# can be edited without touching the code (YAML and SQLite files work too).
 # Each key is an "intent" (what the user wants).
 # "patterns": A list of keywords or phrases to look for in user input.
 # "responses": A list of possible answers the bot can give.
 
-INTENTS = {
-    "greeting": {
-        "patterns": ["hi", "hello", "hey", "good morning", "good evening", "greetings", "sup", "yo"],
-        "responses": ["Hello! How can I help you today?", "Hi there! Nice to see you.", "Greetings! What's on your mind?", "Hey! Ready to chat?"]
-    },
-    "goodbye": {
-        "patterns": ["bye", "see you", "good night", "exit", "quit", "later", "cya"],
-        "responses": ["Goodbye! Have a great day.", "See you later!", "Bye! Come back soon.", "Catch you later!"]
-    },
-    "ask_name": {
-        "patterns": ["what is your name", "who are you", "your name"],
-        "responses": ["I am a simple rule-based chatbot created for the CODSOFT internship.", "I'm a bot! You can call me PyBot."]
-    },
-    "set_name": {
-        "patterns": ["my name is", "i am called"],
-        "responses": ["Nice to meet you, {name}!", "Hello {name}, great to have you here."]
-    },
-    "time": {
-        "patterns": ["time", "clock", "date", "day is it"],
-        "responses": ["The current time is {time}.", "It is currently {time}."]
-    },
-    "feelings_positive": {
-        "patterns": ["happy", "good", "great", "excited", "wonderful", "amazing"],
-        "responses": ["That's great to hear!", "I'm glad you're feeling good!", "Awesome! Keep up the positive vibes.", "Fantastic!"]
-    },
-    "feelings_negative": {
-        "patterns": ["sad", "bad", "stressed", "unhappy", "tired", "angry", "depressed"],
-        "responses": ["I'm sorry to hear that. I hope your day gets better.", "Take a deep breath. It will be okay.", "Sending you virtual hugs!", "Remember, tough times don't last, but tough people do."]
-    },
-    "small_talk": {
-        "patterns": ["how are you", "what are you doing", "what's up", "who created you", "are you real", "favorite color"],
-        "responses": ["I'm just a computer program, but I'm functioning perfectly!", "I'm here waiting to chat with you.", "All systems operational!", "I was created by a Python programmer.", "I love the color of code syntax highlighting!"]
-    },
-    "joke": {
-        "patterns": ["joke", "funny", "laugh"],
-        "responses": [
-            "Why did the scarecrow win an award? Because he was outstanding in his field!",
-            "Why do programmers prefer dark mode? Because light attracts bugs.",
-            "What do you call a fake noodle? An impasta!",
-            "Why did the python cross the road? To get to the other sssssside!",
-            "How do you comfort a JavaScript bug? You console it.",
-            "Why was the math book sad? Because it had too many problems.",
-            "What do you call a bear with no teeth? A gummy bear!"
-        ]
-    },
-    "motivation": {
-        "patterns": ["motivate me", "give me a quote", "inspire me", "i feel down", "motivation", "quote"],
-        "responses": [
-            "Believe you can and you're halfway there.",
-            "The only way to do great work is to love what you do.",
-            "Don't watch the clock; do what it does. Keep going.",
-            "Success is not final, failure is not fatal: It is the courage to continue that counts.",
-            "Your limitation—it's only your imagination."
-        ]
-    },
-    "fun_fact": {
-        "patterns": ["tell me a fact", "fun fact", "did you know", "fact"],
-        "responses": [
-            "Did you know? Honey never spoils. Archaeologists have found pots of honey in ancient Egyptian tombs that are over 3,000 years old and still edible.",
-            "Did you know? Octopuses have three hearts.",
-            "Did you know? Bananas are curved because they grow towards the sun.",
-            "Did you know? The first computer bug was an actual real bug (a moth) stuck in a relay.",
-            "Did you know? Python is named after Monty Python's Flying Circus, not the snake."
-        ]
-    },
-    "weather": {
-        "patterns": ["weather", "is it raining", "temperature", "hot", "cold"],
-        "responses": [
-            "I can't check the real weather, but I hope it's sunny where you are!",
-            "It's always 72 degrees and sunny inside my server.",
-            "You might want to check a weather app for the accurate forecast, but I predict a 100% chance of code!"
-        ]
-    },
-    "advice": {
-        "patterns": ["give me advice", "what should i do", "help me decide", "advice"],
-        "responses": [
-            "Trust your gut instinct.",
-            "Take it one step at a time.",
-            "When in doubt, print(variable) to see what's going on!",
-            "Sleep on it. Things often look clearer in the morning.",
-            "Always backup your code."
-        ]
-    },
-    "gratitude": {
-        "patterns": ["thanks", "thank you", "appreciate it"],
-        "responses": ["You're welcome!", "No problem!", "Happy to help!", "Anytime!"]
-    },
-    # --- FAQ SECTION ---
-    "faq_codsoft": {
-        "patterns": ["what is codsoft", "about codsoft"],
-        "responses": ["CODSOFT is an IT services and IT consultancy company that provides internships to students."]
-    },
-    "faq_ai": {
-        "patterns": ["what is ai", "artificial intelligence"],
-        "responses": ["AI stands for Artificial Intelligence. It's the simulation of human intelligence processes by machines, especially computer systems."]
-    },
-    "faq_chatbot": {
-        "patterns": ["what is a chatbot", "define chatbot"],
-        "responses": ["A chatbot is a software application used to conduct an on-line chat conversation via text or text-to-speech."]
-    },
-    "faq_language": {
-        "patterns": ["what language", "written in", "code"],
-        "responses": ["I am written in Python! It's a great language for beginners and experts alike."]
-    },
-    "faq_capabilities": {
-        "patterns": ["what can you do", "help me", "features"],
-        "responses": ["I can chat, tell jokes, give facts, motivate you, and answer simple questions about CODSOFT and AI."]
+INTENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intents.json")
+
+def _validate_intents(intents, path):
+    """
+    Makes sure every intent has a list of patterns and a list of responses.
+    """
+    if not isinstance(intents, dict):
+        raise ValueError(f"{path}: expected a mapping of intent names to rules")
+    for intent, data in intents.items():
+        for key in ("patterns", "responses"):
+            if not isinstance(data, dict) or not isinstance(data.get(key), list):
+                raise ValueError(f"{path}: intent '{intent}' needs a '{key}' list")
+    return intents
+
+def _load_sqlite_intents(path):
+    """
+    Reads intents from a SQLite table:
+        CREATE TABLE intents (intent TEXT, kind TEXT, text TEXT)
+    where kind is 'pattern' or 'response'. Rows are read in insertion order.
+    """
+    intents = {}
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = connection.execute("SELECT intent, kind, text FROM intents ORDER BY rowid")
+        for intent, kind, text in rows:
+            data = intents.setdefault(intent, {"patterns": [], "responses": []})
+            if kind not in ("pattern", "response"):
+                raise ValueError(f"{path}: unknown kind '{kind}' for intent '{intent}'")
+            data[kind + "s"].append(text)
+    finally:
+        connection.close()
+    return intents
+
+def load_intents(path):
+    """
+    Loads intents from a .json, .yaml/.yml or .db/.sqlite/.sqlite3 file.
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".json":
+        with open(path, encoding="utf-8") as f:
+            intents = json.load(f)
+    elif extension in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("PyYAML is needed to load YAML intents: pip install pyyaml")
+        with open(path, encoding="utf-8") as f:
+            intents = yaml.safe_load(f)
+    elif extension in (".db", ".sqlite", ".sqlite3"):
+        intents = _load_sqlite_intents(path)
+    else:
+        raise ValueError(f"Unsupported intents file: {path}")
+
+    return _validate_intents(intents, path)
+
+# =============================================================================
+# 2. INTENT MATCHER (TOKEN INDEX)
+# =============================================================================
+# Patterns are matched on whole words, so "hi" no longer fires inside "this"
+# and "code" no longer fires inside "decode".
+# Every pattern is split into tokens and stored in a dictionary keyed by its
+# token sequence (an n-gram). To match, we only look up the n-grams that actually
+# occur in the input, so the cost depends on the length of the message and not
+# on how many patterns there are. Each pattern remembers its priority (intent
+# order, then pattern order), so the first intent in the file still wins.
+
+TOKEN_PATTERN = re.compile(r"\w+(?:'\w+)*")
+
+def tokenize(text):
+    """
+    Splits text into lowercase word tokens ("what's up" -> ["what's", "up"]).
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+# -----------------------------------------------------------------------------
+# Typo tolerance
+# -----------------------------------------------------------------------------
+# When no pattern matches, misspelled words ("joek", "motivat") are corrected
+# against the words used in the patterns, and the message is matched again.
+# Candidates are found with a "symmetric delete" index (as in SymSpell): every
+# pattern word is stored under all the strings you get by deleting up to two of
+# its letters. A typo shares at least one of those strings with the word it was
+# meant to be, so only a handful of candidates need an exact distance check.
+# Words found in words.txt (common English words, as in SymSpell's frequency
+# dictionary) are never corrected: "mood" is a word, not a typo of "good".
+
+SPELLING_MAX_DISTANCE = 2   # Largest edit distance the index supports
+MIN_CORRECTABLE_LENGTH = 4  # Shorter words ("hi", "hat") are never corrected
+CORRECTION_CACHE_SIZE = 10000
+WORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "words.txt")
+
+def load_words(path):
+    """
+    Returns the set of words in a word list, one word per line.
+    Lines starting with # are comments.
+    """
+    with open(path, encoding="utf-8") as f:
+        return frozenset(line.strip().lower() for line in f
+                         if line.strip() and not line.startswith("#"))
+
+_dictionary_words = None
+
+def dictionary_words():
+    """
+    Returns the words of words.txt, read the first time they are needed.
+    """
+    global _dictionary_words
+    if _dictionary_words is None:
+        _dictionary_words = load_words(WORDS_PATH)
+    return _dictionary_words
+
+def _deletes(word, distance):
+    """
+    Returns every string made by deleting up to `distance` letters from word.
+    """
+    results = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+def edit_distance(a, b, max_distance):
+    """
+    Optimal string alignment distance (insertions, deletions, substitutions and
+    swaps of neighbouring letters). Returns max_distance + 1 as soon as the
+    distance is known to be larger than max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+class SpellingIndex:
+    """
+    Symmetric delete index over the words used in the patterns.
+    """
+
+    def __init__(self, max_distance=SPELLING_MAX_DISTANCE, known_words=frozenset()):
+        self.max_distance = max_distance
+        self.words = set()
+        self.known_words = known_words   # Real words that are not typos, though not in any pattern
+        self._deletes = {}       # deleted form -> words that produce it
+        self._corrections = {}   # (typo, max_distance) -> correction, since typos repeat
+
+    def add_word(self, word):
+        if word in self.words or len(word) < MIN_CORRECTABLE_LENGTH:
+            return
+        self.words.add(word)
+        for form in _deletes(word, self.max_distance):
+            self._deletes.setdefault(form, []).append(word)
+        self._corrections.clear()
+
+    def is_known(self, word):
+        """
+        True for pattern words and real words, which are never corrected.
+        A contraction ("what's") is known when the word before the apostrophe is.
+        """
+        known_words = self.known_words
+        return (word in self.words or word in known_words
+                or word.split("'", 1)[0] in known_words)
+
+    def correct(self, word, max_distance, deadline=None):
+        """
+        Returns the closest known word within max_distance, or None. A word
+        with several equally close candidates is left alone rather than
+        guessed at. Gives up and returns None once time.perf_counter()
+        passes `deadline`.
+        """
+        key = (word, max_distance)
+        if key in self._corrections:
+            return self._corrections[key]
+
+        try:
+            correction = self._find(word, max_distance, deadline)
+        except TimeoutError:
+            return None   # Not cached: with more time the answer may differ
+        if len(self._corrections) >= CORRECTION_CACHE_SIZE:
+            self._corrections.clear()
+        self._corrections[key] = correction
+        return correction
+
+    def _find(self, word, max_distance, deadline):
+        # Allow one typo per four letters: a word of three letters or fewer is
+        # only one letter away from many ordinary words ("hat" -> "hot")
+        max_distance = min(max_distance, self.max_distance, len(word) // 4)
+        if max_distance <= 0:
+            return None
+
+        best_distance, best = max_distance + 1, set()
+        checked = set()
+        for form in _deletes(word, max_distance):
+            for candidate in self._deletes.get(form, ()):
+                if candidate in checked:
+                    continue
+                if deadline is not None and time.perf_counter() > deadline:
+                    raise TimeoutError
+                checked.add(candidate)
+                distance = edit_distance(word, candidate, max_distance)
+                if distance < best_distance:
+                    best_distance, best = distance, {candidate}
+                elif distance == best_distance:
+                    best.add(candidate)
+        return best.pop() if len(best) == 1 else None
+
+class IntentMatcher:
+    """
+    Inverted index from token n-grams to the intents whose patterns they spell.
+    Patterns can be added at any time without rebuilding the index.
+    The spelling index is only built when first needed (or warmed up in the
+    background, see IntentStore), since it costs more than the rest.
+    """
+
+    def __init__(self, intents=None):
+        self._index = {}        # token tuple -> best (priority, intent)
+        self._prefixes = set()  # every proper prefix of an indexed token tuple
+        self._max_tokens = 0
+        self._intent_order = {}
+        self._pattern_count = {}
+        self._spelling = None
+        self._lock = threading.Lock()   # Guards building the spelling index against add_pattern()
+
+        if intents:
+            for intent, data in intents.items():
+                self.add_intent(intent, data["patterns"])
+
+    def state(self):
+        """
+        Returns the index as plain dicts and sets, for the cache file. Unlike
+        the matcher itself, this unpickles no matter which module defined it.
+        """
+        return {
+            "index": self._index,
+            "prefixes": self._prefixes,
+            "max_tokens": self._max_tokens,
+            "intent_order": self._intent_order,
+            "pattern_count": self._pattern_count,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        matcher = cls()
+        matcher._index = state["index"]
+        matcher._prefixes = state["prefixes"]
+        matcher._max_tokens = state["max_tokens"]
+        matcher._intent_order = state["intent_order"]
+        matcher._pattern_count = state["pattern_count"]
+        return matcher
+
+    def build_spelling(self):
+        """
+        Builds the spelling index now instead of for the first misspelled message.
+        """
+        return self.spelling
+
+    @property
+    def spelling(self):
+        if self._spelling is None:
+            with self._lock:
+                if self._spelling is None:
+                    spelling = SpellingIndex(known_words=dictionary_words())
+                    for tokens in self._index:
+                        for token in tokens:
+                            spelling.add_word(token)
+                    self._spelling = spelling
+        return self._spelling
+
+    def add_intent(self, intent, patterns):
+        """
+        Adds the patterns of an intent. New intents get the lowest priority,
+        just like a new intent appended to the end of the file.
+        """
+        if intent not in self._intent_order:
+            self._intent_order[intent] = len(self._intent_order)
+            self._pattern_count[intent] = 0
+
+        for pattern in patterns:
+            self.add_pattern(intent, pattern)
+
+    def add_pattern(self, intent, pattern):
+        """
+        Indexes a single pattern under its token sequence.
+        """
+        if intent not in self._intent_order:
+            self.add_intent(intent, [])
+        tokens = tuple(tokenize(pattern))
+        if not tokens:
+            return
+
+        priority = (self._intent_order[intent], self._pattern_count[intent])
+        self._pattern_count[intent] += 1
+
+        with self._lock:
+            # The same pattern may appear in several intents; keep the earliest one
+            entry = (priority, intent)
+            if tokens not in self._index or entry < self._index[tokens]:
+                self._index[tokens] = entry
+            for size in range(1, len(tokens)):
+                self._prefixes.add(tokens[:size])
+            self._max_tokens = max(self._max_tokens, len(tokens))
+            if self._spelling is not None:
+                for token in tokens:
+                    self._spelling.add_word(token)
+
+    def match(self, text):
+        """
+        Returns the highest priority intent with a pattern that appears
+        in the text as whole words, or None.
+        """
+        return self._match_tokens(tokenize(text))
+
+    def match_fuzzy(self, text, max_distance=SPELLING_MAX_DISTANCE, time_budget=None):
+        """
+        Corrects misspelled words and matches again. Meant for messages where
+        match() found nothing. Stops correcting once time_budget seconds
+        have passed and matches with the words corrected so far.
+        """
+        if max_distance <= 0:
+            return None
+
+        spelling = self.spelling   # Built first, so that building it is not charged to the budget
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        tokens = tokenize(text)
+        corrected = False
+
+        for position, token in enumerate(tokens):
+            if len(token) < MIN_CORRECTABLE_LENGTH or spelling.is_known(token):
+                continue
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            replacement = spelling.correct(token, max_distance, deadline)
+            if replacement:
+                tokens[position] = replacement
+                corrected = True
+
+        return self._match_tokens(tokens) if corrected else None
+
+    def _match_tokens(self, tokens):
+        index = self._index
+        prefixes = self._prefixes
+        best = None
+
+        for start in range(len(tokens)):
+            stop = min(start + self._max_tokens, len(tokens))
+            for end in range(start + 1, stop + 1):
+                gram = tuple(tokens[start:end])
+                found = index.get(gram)
+                if found is not None and (best is None or found < best):
+                    best = found
+                # Stop growing the n-gram once no pattern starts with it
+                if gram not in prefixes:
+                    break
+
+        return best[1] if best else None
+
+
+# =============================================================================
+# 3. RESPONSE TEMPLATES
+# =============================================================================
+# Responses may contain the placeholders {name} and {time}.
+# Each response is split into its text pieces and placeholders once, when the
+# intents are loaded, so answering a message only has to fill them in.
+# The current time is formatted at most once per second and reused.
+
+class TimestampCache:
+    """
+    Returns the current time as text, re-formatting it only when the second changes.
+    """
+
+    def __init__(self, fmt="%Y-%m-%d %H:%M:%S"):
+        self.fmt = fmt
+        self._second = None
+        self._text = ""
+
+    def now(self):
+        second = int(time.time())
+        if second != self._second:
+            self._text = datetime.datetime.fromtimestamp(second).strftime(self.fmt)
+            self._second = second
+        return self._text
+
+
+clock = TimestampCache()
+
+class ResponseTemplate:
+    """
+    A response with its placeholders found ahead of time.
+    Responses without placeholders are returned as they are.
+    """
+
+    __slots__ = ("text", "parts", "uses_time")
+
+    def __init__(self, text):
+        self.text = text
+        self.parts = None
+        self.uses_time = False
+
+        if "{" not in text:
+            return
+
+        try:
+            pieces = list(string.Formatter().parse(text))
+        except ValueError:
+            # A lone "{" or "}" is not a placeholder; show the response as it is
+            return
+
+        # parts is a list of (literal text, placeholder) pairs
+        parts = []
+        literal = ""
+        for text_before, field, spec, conversion in pieces:
+            literal += text_before
+            if field in ("name", "time") and not spec and not conversion:
+                parts.append((literal, field))
+                literal = ""
+                self.uses_time = self.uses_time or field == "time"
+            elif field is not None:
+                # Unknown placeholders are kept as they are
+                literal += "{" + field + "}"
+        if parts:
+            parts.append((literal, None))
+            self.parts = tuple(parts)
+
+    def render(self, user_name):
+        if self.parts is None:
+            return self.text
+
+        now = clock.now() if self.uses_time else None
+        pieces = []
+        for literal, field in self.parts:
+            pieces.append(literal)
+            if field == "name":
+                pieces.append(user_name)
+            elif field == "time":
+                pieces.append(now)
+        return "".join(pieces)
+
+def compile_responses(intents):
+    """
+    Returns {intent: tuple of ResponseTemplate} for all intents.
+    """
+    return {
+        intent: tuple(ResponseTemplate(response) for response in data["responses"])
+        for intent, data in intents.items()
     }
-}
 
 # =============================================================================
-# 2. HELPER FUNCTIONS
+# 4. INTENT STORE (CACHING & HOT RELOAD)
 # =============================================================================
+# The store keeps the loaded intents together with their compiled matcher
+# and response templates.
+# - Startup: the matcher's index is saved next to the intents file (".cache")
+#   and loaded from there as long as the intents file has not changed. The
+#   cache holds only plain dicts, sets and tuples, so it stays valid whether
+#   chatbot.py runs as a script or is imported (e.g. by server.py). The
+#   spelling index is not cached: restoring it would take about as long as
+#   building it, so it is built in a background thread once the intents are
+#   loaded.
+# - Hot reload: every few seconds the file's modification time is checked.
+#   If it changed, a background thread loads and compiles the new intents;
+#   the next message swaps them in with a single assignment. Running
+#   conversations never wait for the compile or see a half-built matcher.
+
+CACHE_VERSION = 4     # Bump whenever IntentMatcher.state() changes
+RELOAD_INTERVAL = 2.0   # Seconds between checks of the intents file
+
+class IntentStore:
+    """
+    Holds the current (intents, matcher, responses) and reloads them when the file changes.
+    """
+
+    def __init__(self, path=None, intents=None, reload_interval=RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._next_check = time.monotonic() + reload_interval
+        self._reloader = None   # Background thread compiling a changed file
+        self._reloaded = None   # (source, snapshot) it finished, waiting to be swapped in
+
+        if path:
+            self._source, self.snapshot = self._load()
+            threading.Thread(target=self.matcher.build_spelling, daemon=True).start()
+        else:
+            # Intents given directly (e.g. in a worker process): nothing to reload
+            self._source = None
+            self.snapshot = (intents, IntentMatcher(intents), compile_responses(intents))
+
+    @property
+    def intents(self):
+        return self.snapshot[0]
+
+    @property
+    def matcher(self):
+        return self.snapshot[1]
+
+    @property
+    def responses(self):
+        return self.snapshot[2]
+
+    def _stat(self):
+        info = os.stat(self.path)
+        return (info.st_mtime_ns, info.st_size)
+
+    def _load(self):
+        """
+        Returns (source, snapshot), using the compiled cache when it is current.
+        """
+        source = self._stat()
+        cache_path = self.path + ".cache"
+
+        try:
+            with open(cache_path, "rb") as f:
+                version, cached_source, intents, state = pickle.load(f)
+            if version == CACHE_VERSION and cached_source == source:
+                matcher = IntentMatcher.from_state(state)
+                return source, (intents, matcher, compile_responses(intents))
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, KeyError):
+            pass  # Missing or outdated cache: compile from the source file
+
+        intents = load_intents(self.path)
+        matcher = IntentMatcher(intents)
+
+        try:
+            temp_path = cache_path + ".tmp"
+            with open(temp_path, "wb") as f:
+                pickle.dump((CACHE_VERSION, source, intents, matcher.state()), f,
+                            pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass  # Read-only directory: we simply run without a cache
+
+        return source, (intents, matcher, compile_responses(intents))
+
+    def _reload(self, source):
+        """
+        Runs in the background thread: compiles the changed file and leaves
+        the result for reload_if_changed() to swap in.
+        """
+        try:
+            source, snapshot = self._load()
+            snapshot[1].build_spelling()
+            self._reloaded = (source, snapshot)
+        except Exception as error:
+            # Keep serving the old intents if the new file is broken,
+            # and do not try again until it changes once more
+            print(f"Warning: could not reload {self.path}: {error}", file=sys.stderr)
+            self._reloaded = (source, None)
+
+    def reload_if_changed(self):
+        """
+        Swaps in intents reloaded in the background, and every reload_interval
+        seconds starts a reload if the file has changed. Returns True if new
+        intents were swapped in. Intents added with add_intent() are replaced
+        by the file's contents.
+        """
+        if not self.path:
+            return False
+
+        reloaded = self._reloaded
+        if reloaded is not None:
+            self._reloaded = None
+            self._source, snapshot = reloaded
+            if snapshot is not None:
+                self.snapshot = snapshot  # Single assignment: the swap is atomic
+                return True
+
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.reload_interval
+        if self._reloader is not None and self._reloader.is_alive():
+            return False
+
+        try:
+            source = self._stat()
+        except OSError as error:
+            print(f"Warning: could not reload {self.path}: {error}", file=sys.stderr)
+            return False
+        if source == self._source:
+            return False
+
+        self._reloader = threading.Thread(target=self._reload, args=(source,), daemon=True)
+        self._reloader.start()
+        return False
+
+
+# Load (or restore from cache) the intents once at startup
+intent_store = IntentStore(INTENTS_PATH)
+
+def use_intents(path):
+    """
+    Switches the chatbot to a different intents file.
+    """
+    global intent_store
+    intent_store = IntentStore(path)
+
+# =============================================================================
+# 5. HELPER FUNCTIONS
+# =============================================================================
+
+def add_intent(intent, patterns, responses):
+    """
+    Adds (or extends) an intent at runtime.
+    The index is updated incrementally instead of being rebuilt.
+    """
+    intents, matcher, templates = intent_store.snapshot
+    data = intents.setdefault(intent, {"patterns": [], "responses": []})
+    data["patterns"].extend(patterns)
+    data["responses"].extend(responses)
+    matcher.add_intent(intent, patterns)
+    templates[intent] = tuple(ResponseTemplate(response) for response in data["responses"])
+
+# Typo tolerance for messages that match no pattern exactly.
+# Set FUZZY_MAX_DISTANCE to 0 to turn it off.
+FUZZY_MAX_DISTANCE = 2
+FUZZY_TIME_BUDGET = 0.001   # Seconds spent correcting a single message
+
+def _match(user_input):
+    matcher = intent_store.matcher
+    intent = matcher.match(user_input)
+    if intent is None and FUZZY_MAX_DISTANCE > 0:
+        intent = matcher.match_fuzzy(user_input, FUZZY_MAX_DISTANCE, FUZZY_TIME_BUDGET)
+    return intent
 
 def match_intent(user_input):
     """
-    Checks the user_input against the patterns in the INTENTS dictionary.
+    Checks the user_input against the patterns of the loaded intents.
+    Patterns must appear as whole words ("hi" does not match "this").
+    If nothing matches, small typos are corrected and the input is matched again.
     Returns the key of the matching intent (e.g., 'greeting') or None if no match found.
     """
-    user_input = user_input.lower().strip()
-    
-    for intent, data in INTENTS.items():
-        for pattern in data["patterns"]:
-            # Simple keyword matching: check if the pattern exists in the input
-            if pattern in user_input:
-                return intent
-    
-    return None
+    intent_store.reload_if_changed()
+    if not metrics.enabled:
+        return _match(user_input)
+
+    start = time.perf_counter()
+    intent = _match(user_input)
+    metrics.record_match(intent, user_input, time.perf_counter() - start)
+    return intent
 
-def get_response(intent, user_name="User"):
+# Improved fallback with suggestions
+FALLBACK_RESPONSES = tuple(
+    f"I'm not sure I understand. You could ask me to '{suggestion}'!"
+    for suggestion in ["tell me a joke", "give me a fun fact", "what time is it", "motivate me"]
+)
+
+def get_response(intent, user_name="User", rng=random):
     """
     Returns a random response based on the matched intent.
     Handles dynamic placeholders like {name} and {time}.
+    Pass a random.Random as rng to get repeatable answers (e.g. in tests).
+    """
+    if not metrics.enabled:
+        templates = intent_store.responses.get(intent)
+        if templates:
+            return rng.choice(templates).render(user_name)
+        return rng.choice(FALLBACK_RESPONSES)
+
+    start = time.perf_counter()
+    templates = intent_store.responses.get(intent)
+    if templates:
+        response = rng.choice(templates).render(user_name)
+    else:
+        response = rng.choice(FALLBACK_RESPONSES)
+    metrics.record_render(time.perf_counter() - start)
+    return response
+
+# =============================================================================
+# 6. BATCH CLASSIFICATION
+# =============================================================================
+# Used to replay logged utterances without the interactive loop.
+# Input is read lazily in chunks, so memory stays bounded no matter how many
+# utterances there are. With workers > 1 the chunks are spread over a process
+# pool, but results are still yielded in the original order.
+
+def _init_worker(intents, metrics_enabled, fuzzy_max_distance):
+    """
+    Gives each worker process the same intents and settings as the parent
+    (including intents added at runtime with add_intent).
+    """
+    global intent_store, FUZZY_MAX_DISTANCE
+    intent_store = IntentStore(intents=intents)
+    metrics.enabled = metrics_enabled
+    FUZZY_MAX_DISTANCE = fuzzy_max_distance
+
+def _classify_chunk(chunk, user_name, seed=None):
+    """
+    Classifies a list of utterances. Returns (text, intent, response) tuples.
+    """
+    rng = random if seed is None else random.Random(seed)
+    results = []
+    for text in chunk:
+        intent = match_intent(text)
+        results.append((text, intent, get_response(intent, user_name, rng)))
+    return results
+
+def _classify_chunk_in_worker(chunk, user_name, seed):
+    """
+    Like _classify_chunk, but also hands the worker's metrics back to the parent.
+    """
+    results = _classify_chunk(chunk, user_name, seed)
+    return results, (metrics.take() if metrics.enabled else None)
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _chunk_seed(seed, number):
+    # Each chunk gets its own seed, so results do not depend on the number of workers
+    return None if seed is None else f"{seed}:{number}"
+
+def classify_batch(utterances, workers=1, chunk_size=1000, user_name="User", seed=None):
+    """
+    Classifies an iterable of utterances.
+    Yields (text, intent, response) tuples in input order; intent is None
+    when nothing matched. With a seed the chosen responses are repeatable.
+
+    workers > 1 uses a process pool. At most two chunks per worker are in
+    flight at a time, so large inputs are never fully loaded into memory.
     """
-    if intent in INTENTS:
-        responses = INTENTS[intent]["responses"]
-        response = random.choice(responses)
-        
-        # Handle dynamic content
-        if "{name}" in response:
-            response = response.format(name=user_name)
-        
-        if "{time}" in response:
-            now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            response = response.format(time=now)
-            
-        return response
-    
-    # Improved fallback with suggestions
-    suggestions = ["tell me a joke", "give me a fun fact", "what time is it", "motivate me"]
-    suggestion = random.choice(suggestions)
-    return f"I'm not sure I understand. You could ask me to '{suggestion}'!"
-
-# =============================================================================
-# 3. MAIN CHAT LOOP
+    if workers <= 1:
+        for number, chunk in enumerate(_chunks(utterances, chunk_size)):
+            yield from _classify_chunk(chunk, user_name, _chunk_seed(seed, number))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(intent_store.intents, metrics.enabled,
+                                       FUZZY_MAX_DISTANCE)) as pool:
+        pending = []
+        for number, chunk in enumerate(_chunks(utterances, chunk_size)):
+            pending.append(pool.submit(_classify_chunk_in_worker, chunk, user_name,
+                                       _chunk_seed(seed, number)))
+            if len(pending) >= workers * 2:
+                yield from _collect(pending.pop(0))
+        for future in pending:
+            yield from _collect(future)
+
+def _collect(future):
+    results, worker_metrics = future.result()
+    if worker_metrics is not None:
+        metrics.merge(worker_metrics)
+    return results
+
+def _read_utterances(stream, fmt):
+    """
+    Reads utterances from a text stream, one per line.
+    In "jsonl" format each line is either a JSON string or an object with a "text" field.
+    """
+    for line in stream:
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        if fmt == "jsonl":
+            record = json.loads(line)
+            yield record["text"] if isinstance(record, dict) else str(record)
+        else:
+            yield line
+
+def run_batch(path, fmt="auto", workers=1, chunk_size=1000, seed=None):
+    """
+    Classifies every utterance in a file ("-" for stdin), writes one JSON
+    result per line to stdout and reports throughput on stderr.
+    """
+    if fmt == "auto":
+        fmt = "jsonl" if path.endswith(".jsonl") else "text"
+
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    start = time.perf_counter()
+    count = 0
+    try:
+        results = classify_batch(_read_utterances(stream, fmt), workers, chunk_size, seed=seed)
+        for text, intent, response in results:
+            print(json.dumps({"text": text, "intent": intent, "response": response}))
+            count += 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"Classified {count} utterances in {elapsed:.2f}s ({rate:,.0f} utterances/s)", file=sys.stderr)
+
+# =============================================================================
+# 7. CHAT SESSION
+# =============================================================================
+# All the state of one conversation lives in a ChatSession object, so the same
+# logic can drive the console loop below or many clients at once (see server.py).
+
+EXIT_COMMANDS = ["exit", "quit", "bye", "goodbye"]
+
+class ChatSession:
+    """
+    Holds the state of a single conversation.
+    """
+
+    def __init__(self, user_name="Friend", seed=None):
+        self.user_name = user_name
+        self.last_active = time.monotonic()
+        # Each session has its own random generator; a seed makes replies repeatable
+        self.rng = random.Random(seed)
+
+    def set_name(self, user_name):
+        """
+        Stores the user's name and returns the bot's greeting.
+        """
+        self.last_active = time.monotonic()
+        if user_name.strip():
+            self.user_name = user_name
+            return f"Nice to meet you, {user_name}!"
+        self.user_name = "Friend"
+        return "Okay, I'll call you Friend!"
+
+    def reply(self, user_input):
+        """
+        Returns (response, finished) for one message.
+        finished is True when the user wants to end the conversation.
+        """
+        self.last_active = time.monotonic()
+
+        if not user_input.strip():
+            return "Please type something so we can chat!", False
+
+        # Check for exit commands directly first
+        if user_input.lower().strip() in EXIT_COMMANDS:
+            return f"Goodbye, {self.user_name}! Have a great day.", True
+
+        # Find the intent
+        intent = match_intent(user_input)
+
+        # Get the response
+        if intent:
+            return get_response(intent, self.user_name, self.rng), False
+        return "I'm not sure I understand. Can you rephrase?", False
+
+# =============================================================================
+# 8. MAIN CHAT LOOP
 # =============================================================================
 
 def chatbot():
@@ -173,42 +883,61 @@ def chatbot():
     print("I can answer FAQs, tell jokes, give the time, and more!")
     print("Type 'exit' or 'quit' to end the conversation.\n")
 
+    session = ChatSession()
+
     # 1. Ask for the user's name
     user_name = input("Bot: First, what is your name? ")
-    if user_name.strip():
-        print(f"Bot: Nice to meet you, {user_name}!")
-    else:
-        user_name = "Friend"
-        print("Bot: Okay, I'll call you Friend!")
+    print(f"Bot: {session.set_name(user_name)}")
 
     # 2. Start the conversation loop
     while True:
         try:
-            user_input = input(f"{user_name}: ")
+            user_input = input(f"{session.user_name}: ")
         except (EOFError, KeyboardInterrupt):
             # Handle Ctrl+C or Ctrl+D gracefully
             print("\nBot: Goodbye!")
             break
 
-        if not user_input.strip():
-            print("Bot: Please type something so we can chat!")
-            continue
-
-        # Check for exit commands directly first
-        if user_input.lower().strip() in ["exit", "quit", "bye", "goodbye"]:
-            print(f"Bot: Goodbye, {user_name}! Have a great day.")
+        response, finished = session.reply(user_input)
+        print(f"Bot: {response}")
+        if finished:
             break
 
-        # Find the intent
-        intent = match_intent(user_input)
+if __name__ == "__main__":
+    import argparse
 
-        # Get the response
-        if intent:
-            response = get_response(intent, user_name)
-        else:
-            response = "I'm not sure I understand. Can you rephrase?"
+    parser = argparse.ArgumentParser(description="CODSOFT rule-based chatbot")
+    parser.add_argument("--intents", metavar="PATH",
+                        help="load intents from this JSON, YAML or SQLite file")
+    parser.add_argument("--batch", metavar="PATH",
+                        help="classify utterances from a file ('-' for stdin) instead of chatting")
+    parser.add_argument("--format", choices=["auto", "text", "jsonl"], default="auto",
+                        help="input format for --batch (default: by file extension)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes for --batch")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="utterances per worker chunk for --batch")
+    parser.add_argument("--fuzzy-distance", type=int, default=FUZZY_MAX_DISTANCE,
+                        help="number of typos tolerated per word (0 turns typo tolerance off)")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="collect metrics and write them here on exit (.json for JSON, otherwise Prometheus text)")
+    parser.add_argument("--seed",
+                        help="seed for choosing responses in --batch, for repeatable output")
+    args = parser.parse_args()
 
-        print(f"Bot: {response}")
+    if args.intents:
+        use_intents(args.intents)
 
-if __name__ == "__main__":
-    chatbot()
+    FUZZY_MAX_DISTANCE = args.fuzzy_distance
+
+    if args.metrics:
+        metrics.enable()
+
+    try:
+        if args.batch:
+            run_batch(args.batch, args.format, args.workers, args.chunk_size, args.seed)
+        else:
+            chatbot()
+    finally:
+        if args.metrics:
+            metrics.write(args.metrics)
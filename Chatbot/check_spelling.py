@@ -0,0 +1,69 @@
+import sys
+
+from chatbot import INTENTS_PATH, IntentMatcher, dictionary_words, load_intents
+
+# Typo correction check
+# ---------------------
+# Messages that match no pattern get their misspelled words corrected (see
+# "Typo tolerance" in chatbot.py). A correctly spelled word must never be
+# "corrected" into a pattern word: "what a mood" is not about feeling good.
+# This script tries every word of words.txt on its own and in a sentence,
+# checks that known typos are still corrected, and exits with an error if
+# anything is wrong, so it can run in scripts.
+
+# Ordinary messages that used to be rewritten into some intent
+EVERYDAY_MESSAGES = [
+    "I want food", "what a mood", "the hood", "show me the data", "i ate a lime",
+    "tell me something fast", "it is bold",
+]
+
+# Misspelled messages and the intent they should still reach
+TYPOS = {
+    "tell me a joek": "joke",
+    "motivat me": "motivation",
+    "whats the weathr": "weather",
+}
+
+def rewritten_words(matcher, words):
+    """
+    Returns the words that match no pattern but do match one after correction.
+    """
+    return [word for word in words
+            if matcher.match(word) is None and matcher.match_fuzzy(word) is not None]
+
+def run_checks(path=INTENTS_PATH):
+    """
+    Runs every check and prints one line per check. Returns True if all passed.
+    """
+    results = []
+
+    def check(name, passed, details=()):
+        print(f"{'ok  ' if passed else 'FAIL'} {name}")
+        for line in list(details)[:10]:
+            print(f"     {line}")
+        results.append(passed)
+
+    matcher = IntentMatcher(load_intents(path))
+
+    rewritten = rewritten_words(matcher, sorted(dictionary_words()))
+    check("dictionary words are never corrected", not rewritten, rewritten)
+
+    matched = [f"{text!r} -> {matcher.match_fuzzy(text)}" for text in EVERYDAY_MESSAGES
+               if matcher.match(text) is None and matcher.match_fuzzy(text) is not None]
+    check("everyday messages are not rewritten", not matched, matched)
+
+    missed = [f"{text!r} -> {matcher.match_fuzzy(text)}" for text, intent in TYPOS.items()
+              if matcher.match_fuzzy(text) != intent]
+    check("typos are still corrected", not missed, missed)
+
+    return all(results)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check that typo correction leaves real words alone")
+    parser.add_argument("--intents", default=INTENTS_PATH, help="intents file to check (default: %(default)s)")
+    args = parser.parse_args()
+
+    # A nonzero exit code lets scripts notice a failed check
+    sys.exit(0 if run_checks(args.intents) else 1)
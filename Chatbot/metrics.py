@@ -0,0 +1,186 @@
+import bisect
+import json
+import math
+from collections import Counter
+
+# =============================================================================
+# 1. LATENCY HISTOGRAM
+# =============================================================================
+# Latencies are counted in fixed buckets (1 microsecond, 2, 4, ... up to about
+# one second) instead of being stored one by one, so memory use never grows.
+# Percentiles are estimated as the upper bound of the bucket they fall in.
+
+LATENCY_BUCKETS = tuple(1e-6 * 2 ** k for k in range(21))
+MAX_UNMATCHED = 1000   # Distinct unmatched messages we keep counts for
+
+class LatencyHistogram:
+    """
+    Counts latencies (in seconds) in exponential buckets.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)   # Last bucket is "+Inf"
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, q):
+        """
+        Returns the latency (in seconds) below which a fraction q of observations fall.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        running = 0
+        for bucket, count in enumerate(self.counts):
+            running += count
+            if running >= rank:
+                return LATENCY_BUCKETS[bucket] if bucket < len(LATENCY_BUCKETS) else math.inf
+        return math.inf
+
+    def merge(self, other):
+        for bucket, count in enumerate(other.counts):
+            self.counts[bucket] += count
+        self.count += other.count
+        self.total += other.total
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+# =============================================================================
+# 2. CHATBOT METRICS
+# =============================================================================
+# Metrics are off by default. The chatbot checks `metrics.enabled` before timing
+# anything, so when they are off the only cost is one attribute lookup.
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Metrics:
+    """
+    Per-intent hit counts, fallback (no match) counts and latency histograms
+    for intent matching and response rendering.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+
+    def reset(self):
+        self.messages = 0
+        self.fallbacks = 0
+        self.intent_hits = Counter()
+        self.unmatched = Counter()
+        self.match_latency = LatencyHistogram()
+        self.render_latency = LatencyHistogram()
+
+    def record_match(self, intent, user_input, seconds):
+        self.messages += 1
+        self.match_latency.observe(seconds)
+        if intent is None:
+            self.fallbacks += 1
+            # The most common unmatched messages show which patterns to add
+            text = user_input.lower().strip()
+            if text in self.unmatched or len(self.unmatched) < MAX_UNMATCHED:
+                self.unmatched[text] += 1
+        else:
+            self.intent_hits[intent] += 1
+
+    def record_render(self, seconds):
+        self.render_latency.observe(seconds)
+
+    def fallback_rate(self):
+        return self.fallbacks / self.messages if self.messages else 0.0
+
+    def take(self):
+        """
+        Returns the metrics collected so far and starts counting from zero.
+        Used to send a worker process's metrics back to the parent.
+        """
+        taken = Metrics()
+        taken.enabled = self.enabled
+        (taken.messages, taken.fallbacks, taken.intent_hits, taken.unmatched,
+         taken.match_latency, taken.render_latency) = (
+            self.messages, self.fallbacks, self.intent_hits, self.unmatched,
+            self.match_latency, self.render_latency)
+        self.reset()
+        return taken
+
+    def merge(self, other):
+        self.messages += other.messages
+        self.fallbacks += other.fallbacks
+        self.intent_hits.update(other.intent_hits)
+        for text, count in other.unmatched.items():
+            if text in self.unmatched or len(self.unmatched) < MAX_UNMATCHED:
+                self.unmatched[text] += count
+        self.match_latency.merge(other.match_latency)
+        self.render_latency.merge(other.render_latency)
+
+    def snapshot(self, top_unmatched=20):
+        """
+        Returns all metrics as a dictionary (latencies in seconds).
+        """
+        return {
+            "messages": self.messages,
+            "fallbacks": self.fallbacks,
+            "fallback_rate": self.fallback_rate(),
+            "intent_hits": dict(self.intent_hits.most_common()),
+            "top_unmatched": dict(self.unmatched.most_common(top_unmatched)),
+            "match_latency": self.match_latency.summary(),
+            "render_latency": self.render_latency.summary(),
+        }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        lines = [
+            "# TYPE chatbot_messages_total counter",
+            f"chatbot_messages_total {self.messages}",
+            "# TYPE chatbot_fallbacks_total counter",
+            f"chatbot_fallbacks_total {self.fallbacks}",
+            "# TYPE chatbot_intent_hits_total counter",
+        ]
+        for intent, count in sorted(self.intent_hits.items()):
+            lines.append(f'chatbot_intent_hits_total{{intent="{_label(intent)}"}} {count}')
+
+        for name, histogram in (("chatbot_match_latency_seconds", self.match_latency),
+                                ("chatbot_render_latency_seconds", self.render_latency)):
+            lines.append(f"# TYPE {name} histogram")
+            running = 0
+            for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+                running += count
+                lines.append(f'{name}_bucket{{le="{bound:g}"}} {running}')
+            lines.append(f'{name}_bucket{{le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum {histogram.total:.9f}")
+            lines.append(f"{name}_count {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Writes the metrics to a file: JSON for ".json" paths, Prometheus text otherwise.
+        """
+        text = self.to_json() if path.endswith(".json") else self.to_prometheus()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+# Shared by the whole chatbot process
+metrics = Metrics()
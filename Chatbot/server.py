@@ -0,0 +1,202 @@
+import asyncio
+import time
+
+from chatbot import ChatSession, use_intents
+from metrics import metrics
+
+# =============================================================================
+# 1. SERVER SETTINGS
+# =============================================================================
+# The server speaks a plain line-based protocol over TCP: every line the client
+# sends is one message, and every line the server sends is prefixed with "Bot: ".
+# You can try it with:  nc localhost 8765
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_SESSIONS = 10000         # Connections beyond this are turned away
+IDLE_TIMEOUT = 300           # Seconds of silence before a session is evicted
+MAX_LINE_LENGTH = 4096       # Longest message accepted from a client
+WRITE_BUFFER_LIMIT = 65536   # Bytes queued per client before we wait for it to read
+LISTEN_BACKLOG = 4096        # Pending connections the OS may queue for us
+
+# =============================================================================
+# 2. CHAT SERVER
+# =============================================================================
+
+class ChatServer:
+    """
+    Serves many chat sessions from one asyncio event loop.
+    Each connection gets its own ChatSession, so nothing is shared between users.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, max_sessions=MAX_SESSIONS,
+                 idle_timeout=IDLE_TIMEOUT, max_line_length=MAX_LINE_LENGTH, metrics_port=None):
+        self.host = host
+        self.port = port
+        self.metrics_port = metrics_port
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_line_length = max_line_length
+        self.sessions = {}   # writer -> ChatSession
+        self._server = None
+        self._metrics_server = None
+        self._sweeper = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._handle_client, self.host, self.port, limit=self.max_line_length,
+            backlog=min(self.max_sessions, LISTEN_BACKLOG))
+        # Port 0 means "pick a free port"; remember the one we actually got
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._sweeper = asyncio.create_task(self._evict_idle_sessions())
+
+        if self.metrics_port is not None:
+            metrics.enable()
+            self._metrics_server = await asyncio.start_server(
+                self._handle_metrics, self.host, self.metrics_port)
+            self.metrics_port = self._metrics_server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._sweeper:
+            self._sweeper.cancel()
+        if self._metrics_server:
+            self._metrics_server.close()
+            await self._metrics_server.wait_closed()
+        if self._server:
+            self._server.close()
+            for writer in list(self.sessions):
+                writer.close()
+            await self._server.wait_closed()
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Chat server listening on {self.host}:{self.port}")
+        if self._metrics_server:
+            print(f"Metrics available at http://{self.host}:{self.metrics_port}/metrics")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _send(self, writer, message):
+        """
+        Writes one line and waits if the client is not reading fast enough.
+        Because each session handles one line at a time, a slow reader also
+        stops us from reading its next message (backpressure).
+        """
+        writer.write(f"Bot: {message}\n".encode())
+        await writer.drain()
+
+    async def _read_line(self, reader):
+        """
+        Returns the next line from the client, or None if the connection ended.
+        """
+        line = await reader.readline()
+        if not line:
+            return None
+        return line.decode(errors="replace").rstrip("\r\n")
+
+    async def _handle_client(self, reader, writer):
+        if len(self.sessions) >= self.max_sessions:
+            writer.write(b"Bot: Sorry, the server is busy. Please try again later.\n")
+            writer.close()
+            return
+
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_LIMIT)
+        session = ChatSession()
+        self.sessions[writer] = session
+
+        try:
+            await self._send(writer, "Welcome to the CODSOFT rule-based chatbot! Type 'exit' or 'quit' to end the conversation.")
+            await self._send(writer, "First, what is your name?")
+
+            user_name = await self._read_line(reader)
+            if user_name is None:
+                return
+            await self._send(writer, session.set_name(user_name))
+
+            while True:
+                user_input = await self._read_line(reader)
+                if user_input is None:
+                    break
+                response, finished = session.reply(user_input)
+                await self._send(writer, response)
+                if finished:
+                    break
+        except ValueError:
+            # readline() raises ValueError when a line exceeds max_line_length
+            await self._send(writer, "Sorry, that message is too long. Goodbye!")
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions.pop(writer, None)
+            writer.close()
+
+    async def _handle_metrics(self, reader, writer):
+        """
+        A minimal HTTP endpoint: "/metrics.json" returns JSON,
+        any other path returns Prometheus text.
+        """
+        try:
+            request_line = await reader.readline()
+            # Skip the request headers
+            while (await reader.readline()).strip():
+                pass
+            parts = request_line.decode(errors="replace").split()
+            path = parts[1] if len(parts) > 1 else "/"
+
+            if path.endswith(".json"):
+                body, content_type = metrics.to_json(), "application/json"
+            else:
+                body, content_type = metrics.to_prometheus(), "text/plain; version=0.0.4"
+            data = body.encode()
+            writer.write(f"HTTP/1.0 200 OK\r\nContent-Type: {content_type}\r\n"
+                         f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+            await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _evict_idle_sessions(self):
+        """
+        Closes sessions that have been silent for longer than idle_timeout.
+        Closing the connection makes the session's readline() return.
+        """
+        interval = max(1.0, self.idle_timeout / 10)
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for writer, session in list(self.sessions.items()):
+                if now - session.last_active > self.idle_timeout:
+                    self.sessions.pop(writer, None)
+                    writer.close()
+
+# =============================================================================
+# 3. MAIN PROGRAM
+# =============================================================================
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Multi-session chat server for the CODSOFT chatbot")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-sessions", type=int, default=MAX_SESSIONS)
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT,
+                        help="seconds before an idle session is closed")
+    parser.add_argument("--metrics-port", type=int,
+                        help="collect metrics and serve them over HTTP on this port")
+    parser.add_argument("--intents", metavar="PATH",
+                        help="load intents from this JSON, YAML or SQLite file (reloaded when it changes)")
+    args = parser.parse_args()
+
+    if args.intents:
+        use_intents(args.intents)
+
+    server = ChatServer(args.host, args.port, args.max_sessions, args.idle_timeout,
+                        metrics_port=args.metrics_port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\nChat server stopped.")
@@ -0,0 +1,127 @@
+import os
+import random
+import sys
+import tempfile
+
+import numpy as np
+
+import recommender
+from recommender import Model, add_tags, build_neighbours, read_catalog
+
+# Incremental update check
+# ------------------------
+# Adding, removing and replacing movies only updates the neighbour lists that
+# change, instead of rebuilding them. This script makes a random catalog,
+# applies a series of updates, and after each one compares the model with
+# neighbour lists rebuilt from scratch out of the same TF-IDF vectors.
+# Existing movies keep their word weights after an update (see the README),
+# so the rebuild uses the model's own matrix rather than refitting TF-IDF.
+# It exits with an error if anything differs, so it can run in scripts.
+
+def random_catalog(count, first=0, seed=0):
+    """
+    Returns a DataFrame of `count` made-up movies named "Movie <first>" onwards.
+    """
+    import pandas as pd
+
+    rng = random.Random(f"{seed}:{first}")
+    words = ["".join(random.Random(i).choices("abcdefgh", k=4)) for i in range(400)]
+    return add_tags(pd.DataFrame({
+        "title": [f"Movie {i}" for i in range(first, first + count)],
+        "genre": [rng.choice(["Action", "Drama", "Horror"]) for _ in range(count)],
+        "description": [" ".join(rng.choices(words, k=6)) for _ in range(count)],
+    }))
+
+def neighbour_mismatches(model):
+    """
+    Returns how many active movies have different neighbour scores than a full rebuild.
+    Rows are not compared directly: movies with equal scores may come in either order.
+    """
+    k = model.neighbour_indices.shape[1]
+    _, scores = build_neighbours(model.tfidf_matrix, k, active=model.active)
+    ours = np.nan_to_num(np.asarray(model.neighbour_scores)[model.active], neginf=-1.0)
+    theirs = np.nan_to_num(scores[model.active], neginf=-1.0)
+    return int(np.count_nonzero(~np.isclose(ours, theirs, atol=1e-6).all(axis=1)))
+
+def document_counts_match(model):
+    # Counts of removed movies are kept as explicit zeros; only nonzero ones count
+    counts = model.counts
+    found = np.bincount(counts.indices[counts.data > 0], minlength=len(model.terms))
+    return bool((found == np.asarray(model.document_counts)).all())
+
+def run_checks(movies=1500, seed=0):
+    """
+    Runs every check and prints one line per check. Returns True if all passed.
+    """
+    import pandas as pd
+
+    results = []
+
+    def check(name, passed):
+        print(f"{'ok  ' if passed else 'FAIL'} {name}")
+        results.append(passed)
+
+    catalog = random_catalog(movies, seed=seed)
+    model = Model.build(catalog)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.csv")
+        catalog.to_csv(path, index=False)
+        streamed = Model.build_from_chunks(read_catalog(path, chunk_rows=200))
+        check("streamed build equals in-memory build",
+              (streamed.neighbour_indices == model.neighbour_indices).all()
+              and np.allclose(streamed.neighbour_scores, model.neighbour_scores))
+
+        # A year column with gaps is read as floats; duplicate titles must still show "(1997)"
+        path = os.path.join(directory, "duplicates.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("title,description,year\nTitanic,ship,1997\nTitanic,ship,\nDune,sand,1984\n")
+        duplicates = Model.build_from_chunks(read_catalog(path))
+        check("duplicate titles shown with whole years",
+              list(duplicates.names) == ["Titanic (1997)", "Titanic (2)", "Dune"]
+              and duplicates.title_index.lookup("Titanic (1997)") == [0])
+
+        model.add_movies(random_catalog(movies // 10, first=movies, seed=seed))
+        check("neighbours after adding movies", neighbour_mismatches(model) == 0)
+
+        model.remove_movies([f"Movie {i}" for i in range(0, movies, 13)])
+        check("neighbours after removing movies", neighbour_mismatches(model) == 0)
+
+        model.update_movies(random_catalog(40, first=100, seed=seed + 1))
+        check("neighbours after replacing movies", neighbour_mismatches(model) == 0)
+        check("document counts match the term counts", document_counts_match(model))
+
+        model.save(os.path.join(directory, "model"))
+        loaded = Model.load(os.path.join(directory, "model"))
+        check("saved model loads unchanged",
+              (loaded.neighbour_indices == model.neighbour_indices).all()
+              and list(loaded.names) == list(model.names))
+
+        loaded.remove_movies(["Movie 5"])
+        loaded.add_movies(random_catalog(10, first=10 * movies, seed=seed))
+        check("neighbours after updating a loaded model", neighbour_mismatches(loaded) == 0)
+
+        # Replacing a movie in a loaded model finds it by title and year
+        duplicates.save(os.path.join(directory, "duplicates"))
+        duplicates = Model.load(os.path.join(directory, "duplicates"))
+        replacement = add_tags(pd.DataFrame({"title": ["Dune"], "description": ["desert"], "year": [1984]}))
+        duplicates.update_movies(replacement)
+        check("replacing a movie in a loaded model",
+              duplicates.movie_count == 3 and len(duplicates.title_index.lookup("Dune")) == 1)
+
+        recommender.model = loaded
+        check("removed movies are not found", isinstance(recommender.recommend("Movie 5"), str))
+        check("added movies are found", isinstance(recommender.recommend(f"Movie {10 * movies}"), list))
+
+    return all(results)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check incremental model updates against full rebuilds")
+    parser.add_argument("--movies", type=int, default=1500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # A nonzero exit code lets scripts notice a failed check
+    sys.exit(0 if run_checks(args.movies, args.seed) else 1)
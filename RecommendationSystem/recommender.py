@@ -1,6 +1,14 @@
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import hashlib
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+import scipy.sparse as sp
+
+# pandas and scikit-learn are only needed to build the model, not to serve
+# recommendations from saved artifacts, so they are imported when used.
 
 # =============================================================================
 # 1. CREATE MOVIE DATASET
@@ -45,95 +53,1330 @@ movies_data = {
     ]
 }
 
-# Create DataFrame
-movies_df = pd.DataFrame(movies_data)
+def movies_dataframe():
+    """
+    Returns the movie dataset above as a DataFrame.
+    """
+    import pandas as pd
+    return add_tags(pd.DataFrame(movies_data))
 
 # =============================================================================
 # 2. FEATURE ENGINEERING
 # =============================================================================
 # Combine 'genre' and 'description' into a single 'tags' column.
 # This will be used to compute similarity between movies.
+#
+# Big catalogs are read from a CSV or Parquet file in chunks of CHUNK_ROWS
+# movies, so the whole file is never in memory at once. A catalog needs a
+# 'title' column and may have 'genre', 'description', 'year' and 'id' columns.
 
-movies_df['tags'] = movies_df['genre'] + ' ' + movies_df['description']
+CATALOG_COLUMNS = ['title', 'genre', 'description', 'year', 'id']
+CHUNK_ROWS = 10000
+
+def add_tags(df):
+    genre = df['genre'].fillna('') if 'genre' in df.columns else ''
+    description = df['description'].fillna('') if 'description' in df.columns else ''
+    df['tags'] = genre + ' ' + description
+    return df
+
+def read_catalog(path, chunk_rows=CHUNK_ROWS):
+    """
+    Reads a CSV or Parquet catalog chunk by chunk.
+    
+    Returns:
+    - iterator of DataFrames with at most chunk_rows movies each, with 'tags' added.
+    """
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet catalogs needs pyarrow: pip install pyarrow") from None
+        parquet = pq.ParquetFile(path)
+        columns = [c for c in CATALOG_COLUMNS if c in parquet.schema_arrow.names]
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield add_tags(batch.to_pandas())
+    else:
+        import pandas as pd
+        header = pd.read_csv(path, nrows=0).columns
+        columns = [c for c in CATALOG_COLUMNS if c in header]
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=chunk_rows):
+            yield add_tags(chunk)
 
 # =============================================================================
 # 3. TF-IDF VECTORIZATION
 # =============================================================================
 # TF-IDF (Term Frequency-Inverse Document Frequency) converts text into numerical vectors.
 # It gives more weight to important words and less to common words.
+#
+# We compute TF-IDF ourselves, the same way scikit-learn's TfidfVectorizer
+# does by default, so that we can keep the raw term counts and how many movies
+# each term appears in. With those, movies can be added and removed later
+# without refitting: only the counts of the terms involved change.
+
+TFIDF_OPTIONS = {'stop_words': 'english'}
+
+def tfidf_analyzer():
+    """
+    Returns the function that splits text into terms (lower case, no stop words).
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return TfidfVectorizer(**TFIDF_OPTIONS).build_analyzer()
+
+def idf_weights(document_counts, n_documents):
+    """
+    Inverse document frequency, smoothed as in scikit-learn: ln((1 + n) / (1 + df)) + 1.
+    """
+    return np.log((1 + n_documents) / (1 + np.asarray(document_counts, dtype=np.float64))) + 1
+
+def tfidf_rows(counts, idf):
+    """
+    Weights a sparse term-count matrix by idf and scales every row to length 1.
+    The result shares its index arrays with `counts`.
+    """
+    data = counts.data * idf[counts.indices]
+    row_of = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+    norms = np.sqrt(np.bincount(row_of, weights=data * data, minlength=counts.shape[0]))
+    norms[norms == 0] = 1
+    data /= norms[row_of]
+    return sp.csr_matrix((data, counts.indices, counts.indptr), shape=counts.shape, copy=False)
+
+class TermCounter:
+    """
+    Turns texts into rows of term counts. New terms are added to the vocabulary
+    as they appear, and the number of documents containing each term is kept.
+    """
 
-tfidf = TfidfVectorizer(stop_words='english')
-tfidf_matrix = tfidf.fit_transform(movies_df['tags'])
+    def __init__(self, terms=(), document_counts=()):
+        self.terms = list(terms)
+        self.vocabulary = {term: column for column, term in enumerate(self.terms)}
+        self.document_counts = list(document_counts)
+        self.analyzer = tfidf_analyzer()
+
+    def count(self, texts):
+        """
+        Returns a CSR matrix of term counts, one row per text, as wide as the vocabulary.
+        """
+        indptr = [0]
+        indices = []
+        data = []
+        for text in texts:
+            row = {}
+            for term in self.analyzer(text):
+                column = self.vocabulary.get(term)
+                if column is None:
+                    column = self.vocabulary[term] = len(self.terms)
+                    self.terms.append(term)
+                    self.document_counts.append(0)
+                row[column] = row.get(column, 0) + 1
+            for column in sorted(row):
+                indices.append(column)
+                data.append(row[column])
+                self.document_counts[column] += 1
+            indptr.append(len(indices))
+        return sp.csr_matrix((np.array(data, dtype=np.float64), np.array(indices, dtype=np.int32),
+                              np.array(indptr, dtype=np.int64)), shape=(len(texts), len(self.terms)))
 
 # =============================================================================
-# 4. COMPUTE COSINE SIMILARITY
+# 4. PRECOMPUTE TOP-K NEIGHBOURS
 # =============================================================================
 # Cosine similarity measures how similar two vectors are.
 # Values range from 0 (not similar) to 1 (identical).
+#
+# A full N x N similarity matrix does not scale: 500,000 titles would need
+# terabytes of memory. Instead we only keep each movie's TOP_K most similar
+# movies. Similarities are computed a block of rows at a time, so at most
+# BLOCK_CELLS scores are held in memory at once, whatever the catalog size.
+#
+# TfidfVectorizer scales every row to length 1, so the dot product of two rows
+# is already their cosine similarity.
+
+TOP_K = 50              # Neighbours kept per movie (the most recommend() can return)
+BLOCK_CELLS = 2 ** 24   # Similarity scores computed at once (~128 MB as float64)
+
+def top_n(scores, n):
+    """
+    Finds the n highest scores in each row of a 2-D array without sorting whole rows.
+
+    Returns:
+    - array of shape (rows, n): column indices, best first. Equal scores are
+      ordered by lower column index, so the result never depends on how
+      numpy happens to partition the row.
+    """
+    n_rows, n_cols = scores.shape
+    n = max(0, min(n, n_cols))
+    if n == 0:
+        return np.empty((n_rows, 0), dtype=np.intp)
 
-similarity_matrix = cosine_similarity(tfidf_matrix, tfidf_matrix)
+    # The n-th highest score of each row
+    partitioned = -scores
+    partitioned.partition(n - 1, axis=1)
+    kth = -partitioned[:, n - 1, None]
+    del partitioned
+
+    # Everything above it is chosen; the remaining places go to the lowest
+    # columns equal to it. Sparse rows can have thousands of columns tied at 0,
+    # so only rows with more ties than places count them off.
+    chosen = scores > kth
+    ties = scores == kth
+    places = n - np.count_nonzero(chosen, axis=1)
+    crowded = np.flatnonzero(np.count_nonzero(ties, axis=1) > places)
+    if len(crowded):
+        tie_counts = ties[crowded].astype(np.int32)
+        np.cumsum(tie_counts, axis=1, out=tie_counts)   # In place: no second int array
+        keep = tie_counts <= places[crowded, None]
+        del tie_counts
+        ties[crowded] &= keep
+    chosen |= ties
+    del ties
+
+    # Exactly n per row, in column order; sort each row by score only.
+    # The sort is stable, so equal scores keep the lower column first.
+    rows, columns = np.nonzero(chosen)
+    columns = columns.reshape(n_rows, n)
+    order = np.argsort(-scores[rows, columns.ravel()].reshape(n_rows, n), axis=1, kind="stable")
+    return np.take_along_axis(columns, order, axis=1)
+
+def build_neighbours(matrix, k=TOP_K, block_cells=BLOCK_CELLS, rows=None, active=None):
+    """
+    Finds the k most similar rows for every row of a row-normalized matrix.
+
+    Parameters:
+    - rows: Only find neighbours for these rows (default: all rows).
+    - active: Boolean mask of rows that may be neighbours (default: all rows).
+
+    Returns:
+    - (indices, scores): two arrays of shape (len(rows), k). Each row lists
+      the neighbours of that movie from most to least similar, never the movie
+      itself. If there are fewer than k candidates, the rest is filled with
+      index -1 and score -inf.
+    """
+    n_items = matrix.shape[0]
+    rows = np.arange(n_items) if rows is None else np.asarray(rows, dtype=np.intp)
+    k = max(0, min(k, n_items - 1))
+    indices = np.empty((len(rows), k), dtype=np.int32)
+    scores = np.empty((len(rows), k), dtype=np.float32)
+    if k == 0:
+        return indices, scores
+
+    matrix_t = matrix.T.tocsr()
+    block_rows = max(1, block_cells // n_items)
+
+    for start in range(0, len(rows), block_rows):
+        block_movies = rows[start:start + block_rows]
+        block = (matrix[block_movies] @ matrix_t).toarray()
+
+        # A movie is never recommended for itself, nor are removed movies
+        block[np.arange(len(block_movies)), block_movies] = -np.inf
+        if active is not None:
+            block[:, ~active] = -np.inf
+
+        top = top_n(block, k)
+        top_scores = np.take_along_axis(block, top, axis=1)
+        top[top_scores == -np.inf] = -1
+        indices[start:start + len(block_movies)] = top
+        scores[start:start + len(block_movies)] = top_scores
+
+    return indices, scores
+
+def exact_search(matrix, vectors, n, active=None, exclude=None, block_cells=BLOCK_CELLS,
+                 matrix_t=None):
+    """
+    Scores row-normalized query vectors against every row of `matrix`.
+
+    Parameters:
+    - active: Boolean mask of rows that may be returned (default: all rows).
+    - exclude: One array of rows per query that must not be returned.
+    - matrix_t: matrix.T as a CSR matrix, if already computed.
+
+    Returns:
+    - (indices, scores): arrays of shape (queries, n), best first, padded
+      with index -1 and score -inf if there are fewer than n rows to return.
+    """
+    n_queries = vectors.shape[0]
+    n = max(0, min(n, matrix.shape[0]))
+    indices = np.empty((n_queries, n), dtype=np.intp)
+    scores = np.empty((n_queries, n), dtype=np.float64)
+    block_rows = max(1, block_cells // max(matrix.shape[0], 1))
+    if matrix_t is None:
+        matrix_t = matrix.T.tocsr()
+
+    for start in range(0, n_queries, block_rows):
+        end = min(start + block_rows, n_queries)
+        block = (vectors[start:end] @ matrix_t).toarray()
+        if active is not None:
+            block[:, ~active] = -np.inf
+        if exclude is not None:
+            for i in range(start, end):
+                block[i - start, exclude[i]] = -np.inf
+
+        top = top_n(block, n)
+        top_scores = np.take_along_axis(block, top, axis=1)
+        top[top_scores == -np.inf] = -1
+        indices[start:end] = top
+        scores[start:end] = top_scores
+
+    return indices, scores
 
 # =============================================================================
-# 5. RECOMMENDATION FUNCTION
+# 5. TITLE INDEX
 # =============================================================================
+# Titles are looked up in a dictionary keyed by a normalized form of the title
+# (lower case, punctuation and extra spaces removed), so "the dark knight" and
+# "The Dark Knight" find the same movie instantly, however big the catalog is.
+#
+# Several movies can share a title. Those are told apart by their year (or id)
+# when the catalog has a 'year' (or 'id') column, otherwise by their number in
+# the list, e.g. "Titanic (1997)".
+#
+# When a name is not found we suggest the closest titles. Every title is split
+# into trigrams (3-letter pieces: "matrix" -> " ma", "mat", "atr", ...), and an
+# inverted index maps each trigram to the titles containing it. Titles sharing
+# the most trigrams with the name are the best suggestions.
 
-def recommend(movie_name, n=5):
+MIN_SUGGESTION_SCORE = 0.3   # Dice similarity of trigram sets (0 = nothing shared, 1 = same)
+COMMON_TRIGRAM_ROWS = 1000   # Trigrams in more titles than this are not used to find candidates
+SUGGESTION_SHORTLIST = 200   # Candidates sharing the most rare trigrams that get an exact score
+
+def normalize_title(name):
+    return " ".join(re.sub(r"[^\w]+", " ", name.casefold()).split())
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TitleIndex:
     """
-    Recommends movies similar to the given movie.
-    
-    Parameters:
-    - movie_name (str): The name of the movie to base recommendations on.
-    - n (int): Number of recommendations to return (default: 5).
+    Finds movies by title (exact, ignoring case and punctuation) and suggests
+    close titles for misspelled names.
+    """
+
+    def __init__(self, titles=(), keys=None):
+        self.titles = []        # Title of every row, as given
+        self.keys = []          # Year or id of every row, used for duplicate titles
+        self.names = []         # Title shown for every row
+        self.rows = {}          # normalized title -> rows with that title
+        self.postings = {}      # trigram -> rows whose title contains it (sorted)
+        self.gram_counts = np.empty(0, dtype=np.int32)
+        self.add(titles, keys)
+
+    def add(self, titles, keys=None):
+        """
+        Adds movies as new rows at the end of the index.
+        """
+        titles = list(titles)
+        first = len(self.titles)
+        keys = list(keys) if keys is not None else [None] * len(titles)
+
+        new_postings = {}
+        gram_counts = np.empty(len(titles), dtype=np.int32)
+        for offset, (title, key) in enumerate(zip(titles, keys)):
+            row = first + offset
+            if key is None:
+                key = row + 1   # No year or id: number the movie instead
+            name = normalize_title(title)
+            self.titles.append(title)
+            self.keys.append(key)
+            self.names.append(title)
+
+            same_title = self.rows.setdefault(name, [])
+            same_title.append(row)
+            if len(same_title) > 1:
+                for other in same_title:
+                    self._show_key(other)
+
+            grams = trigrams(name)
+            gram_counts[offset] = len(grams)
+            for gram in grams:
+                new_postings.setdefault(gram, []).append(row)
+
+        for gram, rows in new_postings.items():
+            rows = np.array(rows, dtype=np.int32)
+            if gram in self.postings:
+                rows = np.concatenate((self.postings[gram], rows))
+            self.postings[gram] = rows
+        self.gram_counts = np.concatenate((self.gram_counts, gram_counts))
+
+    def _show_key(self, row):
+        # Duplicate titles are shown (and can be looked up) as "Title (key)"
+        name = f"{self.titles[row]} ({self.keys[row]})"
+        if self.names[row] != name:
+            self.names[row] = name
+            self.rows.setdefault(normalize_title(name), []).append(row)
+
+    def remove(self, rows):
+        """
+        Stops finding or suggesting the movies in these rows.
+        Row numbers of other movies do not change.
+        """
+        removed_grams = set()
+        for row in rows:
+            for name in {self.titles[row], self.names[row]}:
+                key = normalize_title(name)
+                same_title = self.rows.get(key, [])
+                if row in same_title:
+                    same_title.remove(row)
+                    if not same_title:
+                        del self.rows[key]
+            removed_grams |= trigrams(normalize_title(self.titles[row]))
+
+        removed = np.asarray(list(rows), dtype=np.int32)
+        for gram in removed_grams:
+            kept = self.postings[gram][~np.isin(self.postings[gram], removed)]
+            if len(kept):
+                self.postings[gram] = kept
+            else:
+                del self.postings[gram]
+
+    def lookup(self, name):
+        """
+        Returns the rows of the movies called `name` (an empty list if there are none).
+        """
+        return self.rows.get(normalize_title(name), [])
+
+    def _postings(self, gram):
+        return self.postings.get(gram)
+
+    def suggest(self, name, limit=5, min_score=MIN_SUGGESTION_SCORE):
+        """
+        Returns up to `limit` titles that look like `name`, closest first.
+        """
+        grams = trigrams(normalize_title(name))
+        matches = [self._postings(gram) for gram in grams]
+        matches = sorted((rows for rows in matches if rows is not None), key=len)
+        if not matches:
+            return []
+
+        # Candidates come from the rarer trigrams only, because a trigram like
+        # "the" can be in most titles. Titles that share nothing but common
+        # trigrams with the name could not score well anyway.
+        rare = [rows for rows in matches if len(rows) <= COMMON_TRIGRAM_ROWS] or matches[:1]
+        candidates, shared = np.unique(np.concatenate(rare), return_counts=True)
+        if len(candidates) > SUGGESTION_SHORTLIST:
+            keep = np.sort(np.argpartition(-shared, SUGGESTION_SHORTLIST - 1)[:SUGGESTION_SHORTLIST])
+            candidates, shared = candidates[keep], shared[keep]
+
+        # Add the common trigrams back so the candidates' counts are exact
+        # (posting lists are sorted, so membership is a binary search)
+        for rows in matches[len(rare):]:
+            positions = np.minimum(np.searchsorted(rows, candidates), len(rows) - 1)
+            shared += rows[positions] == candidates
+
+        scores = 2 * shared / (len(grams) + self.gram_counts[candidates])
+        best = top_n(scores[None, :], limit)[0]
+        return [self.names[candidates[i]] for i in best if scores[i] >= min_score]
+
+    def to_arrays(self):
+        """
+        Returns the index as arrays for MappedTitleIndex (names are saved by the model).
+        """
+        pairs = sorted((_name_hash(name), row) for name, rows in self.rows.items() for row in rows)
+        grams = sorted(self.postings, key=_gram_code)
+        lengths = [len(self.postings[gram]) for gram in grams]
+        titles, title_offsets = _pack_strings(self.titles)
+        keys, key_offsets = _pack_strings([str(key) for key in self.keys])
+        return {
+            "title_texts": titles,
+            "title_offsets": title_offsets,
+            "title_keys": keys,
+            "title_key_offsets": key_offsets,
+            "title_hashes": np.array([h for h, row in pairs], dtype=np.int64),
+            "title_rows": np.array([row for h, row in pairs], dtype=np.int32),
+            "gram_codes": np.array([_gram_code(gram) for gram in grams], dtype=np.int64),
+            "gram_indptr": np.concatenate(([0], np.cumsum(lengths, dtype=np.int64))),
+            "gram_rows": (np.concatenate([self.postings[gram] for gram in grams]).astype(np.int32)
+                          if grams else np.empty(0, dtype=np.int32)),
+            "gram_counts": self.gram_counts,
+        }
+
+TITLE_INDEX_ARRAYS = ("title_texts", "title_offsets", "title_keys", "title_key_offsets",
+                      "title_hashes", "title_rows", "gram_codes", "gram_indptr", "gram_rows",
+                      "gram_counts")
+
+def _name_hash(name):
+    # Python's hash() of a string changes from process to process, so saved
+    # files use a fixed hash instead (63 bits, to fit in an int64)
+    digest = hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") >> 1
+
+def _gram_code(gram):
+    # Three characters packed into one number (a character fits in 21 bits)
+    return ord(gram[0]) << 42 | ord(gram[1]) << 21 | ord(gram[2])
+
+class MappedTitleIndex(TitleIndex):
+    """
+    A TitleIndex kept in the arrays made by TitleIndex.to_arrays(), so that it
+    can be memory-mapped like the rest of a saved model. Titles are found by
+    binary search over hashes of their normalized names, and each trigram's
+    rows are a slice of one array. It cannot be changed; see thaw().
+    """
+
+    def __init__(self, names, arrays):
+        # Plain ndarray views of the memory maps: the memmap subclass makes
+        # every binary search several times slower
+        arrays = {name: np.asarray(array) for name, array in arrays.items()}
+        self.names = names
+        self.titles = PackedStrings(arrays["title_texts"], arrays["title_offsets"])
+        self.keys = PackedStrings(arrays["title_keys"], arrays["title_key_offsets"])
+        self.hashes = arrays["title_hashes"]
+        self.hash_rows = arrays["title_rows"]
+        self.gram_codes = arrays["gram_codes"]
+        self.gram_indptr = arrays["gram_indptr"]
+        self.gram_rows = arrays["gram_rows"]
+        self.gram_counts = arrays["gram_counts"]
+
+    def lookup(self, name):
+        name = normalize_title(name)
+        h = _name_hash(name)
+        start = np.searchsorted(self.hashes, h, side="left")
+        end = np.searchsorted(self.hashes, h, side="right")
+        # Different names may (very rarely) share a hash, so check the names too
+        return [int(row) for row in self.hash_rows[start:end]
+                if name in (normalize_title(self.titles[row]), normalize_title(self.names[row]))]
+
+    def _postings(self, gram):
+        code = _gram_code(gram)
+        i = np.searchsorted(self.gram_codes, code)
+        if i == len(self.gram_codes) or self.gram_codes[i] != code:
+            return None
+        return self.gram_rows[self.gram_indptr[i]:self.gram_indptr[i + 1]]
+
+    def add(self, titles, keys=None):
+        raise TypeError("A memory-mapped title index cannot be changed; use thaw() first")
+
+    def remove(self, rows):
+        raise TypeError("A memory-mapped title index cannot be changed; use thaw() first")
+
+    def thaw(self, active):
+        """
+        Returns an equivalent TitleIndex that can be changed.
+        `active` marks the rows that have not been removed.
+        """
+        titles = [self.titles[row] for row in range(len(self.titles))]
+        keys = [self.keys[row] for row in range(len(self.keys))]
+        title_index = TitleIndex(titles, keys)
+        title_index.remove(np.flatnonzero(~np.asarray(active)))
+        return title_index
+
+def _title_keys(df):
+    """
+    Returns the year (or else the id) of every movie in a DataFrame, or None
+    if it has neither column. pandas reads a year column with gaps as floats,
+    so 1997.0 becomes 1997; movies with neither value get None.
+    """
+    import pandas as pd
+
+    columns = [df[column].tolist() for column in ('year', 'id') if column in df.columns]
+    if not columns:
+        return None
+    keys = []
+    for values in zip(*columns):
+        key = next((value for value in values if not pd.isna(value)), None)
+        if isinstance(key, float) and key.is_integer():
+            key = int(key)
+        keys.append(key)
+    return keys
+
+# =============================================================================
+# 6. APPROXIMATE NEAREST NEIGHBOURS
+# =============================================================================
+# Recommendations for a free-text description or a set of movies cannot use
+# the precomputed neighbour lists directly; the query has to be compared with
+# the catalog. Comparing with every movie is exact but slow for a big catalog.
+#
+# Instead we search the neighbour lists as a graph, like the bottom layer of
+# an HNSW index: start from a few movies near the query, then keep following
+# the neighbour lists of the best movies found so far (a beam of ANN_BEAM
+# movies) until none of them leads anywhere better. Only the movies on the way
+# are scored.
+#
+# Neighbour lists mostly link movies about the same things, so the graph falls
+# apart into groups that are hardly connected; the search has to start in the
+# right one. Starting points come from three places:
+# - the movies that weigh the query's ANN_ENTRY_TERMS strongest words highest,
+#   read from the transposed TF-IDF matrix (an inverted index);
+# - locality-sensitive hashing (LSH). Each of LSH_TABLES tables draws LSH_BITS
+#   random directions (hyperplanes); a vector's bucket records on which side of
+#   each plane it lies, so vectors pointing in similar directions usually share
+#   a bucket;
+# - a fixed random sample of ANN_ENTRY_SAMPLE movies, so that a query always
+#   has somewhere to start.
+
+LSH_TABLES = 4
+LSH_BITS = 8
+LSH_SEED = 0
+ANN_ENTRY_SAMPLE = 32   # Random movies every search starts from, besides the LSH candidates
+ANN_ENTRY_TERMS = 4     # Query words whose best movies the search starts from
+ANN_BEAM = 40           # Best movies kept while searching; larger is slower but finds more
+ANN_EXPAND = 8          # Movies whose neighbour lists are followed per step
+
+class LSHIndex:
+    """
+    Random-projection LSH over row-normalized vectors. Each table is stored as
+    the rows sorted by bucket, so finding a bucket is a binary search.
+    """
+
+    def __init__(self, sorted_rows, sorted_buckets, tables=LSH_TABLES, bits=LSH_BITS, seed=LSH_SEED):
+        self.sorted_rows = sorted_rows          # (tables, rows): rows ordered by bucket
+        self.sorted_buckets = sorted_buckets    # (tables, rows): the bucket of each of those rows
+        self.tables = tables
+        self.bits = bits
+        self.seed = seed
+        self._planes = None
+
+    def planes(self, n_terms):
+        # Drawn from a fixed seed, so they never need saving; numpy fills the
+        # array row by row, so a larger vocabulary keeps the earlier terms' rows
+        if self._planes is None or self._planes.shape[0] < n_terms:
+            rng = np.random.default_rng(self.seed)
+            self._planes = rng.standard_normal((n_terms, self.tables * self.bits)).astype(np.float32)
+        return self._planes[:n_terms]
+
+    def buckets(self, vectors, block_rows=10000):
+        """
+        Returns the bucket of each vector in each table, shape (vectors, tables).
+        """
+        planes = self.planes(vectors.shape[1])
+        weights = (1 << np.arange(self.bits)).astype(np.uint32)
+        buckets = np.empty((vectors.shape[0], self.tables), dtype=np.uint32)
+        for start in range(0, vectors.shape[0], block_rows):
+            sides = np.asarray(vectors[start:start + block_rows] @ planes) > 0
+            buckets[start:start + block_rows] = sides.reshape(-1, self.tables, self.bits) @ weights
+        return buckets
+
+    @classmethod
+    def build(cls, matrix, tables=LSH_TABLES, bits=LSH_BITS, seed=LSH_SEED):
+        index = cls(None, None, tables, bits, seed)
+        buckets = index.buckets(matrix).T
+        index.sorted_rows = np.argsort(buckets, axis=1, kind="stable").astype(np.int32)
+        index.sorted_buckets = np.take_along_axis(buckets, index.sorted_rows, axis=1)
+        return index
+
+    def candidates(self, buckets, limit=ANN_BEAM):
+        """
+        Returns up to `limit` rows from each table that share a bucket with a
+        query. `buckets` is one row of the result of buckets().
+        """
+        found = []
+        for table, bucket in enumerate(buckets):
+            start = np.searchsorted(self.sorted_buckets[table], bucket, side="left")
+            end = np.searchsorted(self.sorted_buckets[table], bucket, side="right")
+            found.append(self.sorted_rows[table, start:min(end, start + limit)])
+        return np.concatenate(found)
+
+def _score_rows(arrays, rows, query):
+    """
+    Dot products of some rows of a CSR matrix, given as its (data, indices,
+    indptr) arrays, with a dense query vector. This is much faster than
+    slicing the matrix when it is done many times for a few rows.
+    """
+    data, indices, indptr = arrays
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    ends = np.cumsum(lengths)
+    positions = np.arange(ends[-1] if len(ends) else 0) + np.repeat(starts - (ends - lengths), lengths)
+    products = data[positions] * query[indices[positions]]
+    return np.bincount(np.repeat(np.arange(len(rows)), lengths), weights=products, minlength=len(rows))
+
+def _entry_rows(postings, query_terms, query_weights, n_terms, limit):
+    """
+    Returns up to `limit` rows with the highest weight for each of the query's
+    n_terms highest-weighted terms. `postings` holds the (data, indices, indptr)
+    arrays of the transposed matrix.
+    """
+    data, indices, indptr = postings
+    found = []
+    for term in query_terms[np.argsort(-query_weights, kind="stable")[:n_terms]]:
+        start, end = indptr[term], indptr[term + 1]
+        if end - start > limit:
+            start += np.argpartition(-data[start:end], limit - 1)[:limit]
+        else:
+            start = np.arange(start, end)
+        found.append(indices[start])
+    return np.concatenate(found) if found else np.empty(0, dtype=np.intp)
+
+def ann_search(matrix, graph, lsh, vectors, n, active=None, exclude=None, matrix_t=None,
+               beam=ANN_BEAM, expand=ANN_EXPAND, entry_sample=ANN_ENTRY_SAMPLE,
+               entry_terms=ANN_ENTRY_TERMS):
+    """
+    Approximate version of exact_search(): finds movies similar to each query
+    by searching the neighbour graph (graph[i] lists the neighbours of row i).
+    matrix_t (matrix.T as a CSR matrix) is needed to start from the query's
+    strongest words. Queries that find fewer than n movies fall back to
+    exact_search().
+    """
+    n_items = matrix.shape[0]
+    n = max(0, min(n, n_items))
+    beam = max(beam, n)
+    indices = np.full((vectors.shape[0], n), -1, dtype=np.intp)
+    scores = np.full((vectors.shape[0], n), -np.inf)
+    rng = np.random.default_rng(lsh.seed)
+    sample = rng.choice(n_items, size=min(entry_sample, n_items), replace=False)
+
+    # Plain arrays: indexing memory-mapped arrays adds overhead to every step
+    graph = np.asarray(graph)
+    arrays = (np.asarray(matrix.data), np.asarray(matrix.indices), np.asarray(matrix.indptr))
+    postings = None if matrix_t is None else (
+        np.asarray(matrix_t.data), np.asarray(matrix_t.indices), np.asarray(matrix_t.indptr))
+
+    for i, buckets in enumerate(lsh.buckets(vectors)):
+        vector = vectors[i]
+        query = vector.toarray().ravel()
+        visited = np.zeros(n_items, dtype=bool)
+        entries = [lsh.candidates(buckets, beam), sample]
+        if postings is not None:
+            entries.append(_entry_rows(postings, vector.indices, vector.data, entry_terms, beam))
+        rows = np.unique(np.concatenate(entries))
+        visited[rows] = True
+        row_scores = _score_rows(arrays, rows, query)
+        scored_rows, scored = [rows], [row_scores]
+
+        # The beam: the best rows found so far, and whether they were followed yet
+        best = top_n(row_scores[None, :], beam)[0]
+        beam_rows, beam_scores = rows[best], row_scores[best]
+        followed = np.zeros(len(beam_rows), dtype=bool)
+
+        while not followed.all():
+            # Follow the best rows not followed yet (the beam is sorted best first)
+            step = np.flatnonzero(~followed)[:expand]
+            followed[step] = True
+            new_rows = graph[beam_rows[step]].ravel()
+            new_rows = new_rows[new_rows >= 0]
+            new_rows = np.unique(new_rows[~visited[new_rows]])
+            if not len(new_rows):
+                continue
+            visited[new_rows] = True
+            new_scores = _score_rows(arrays, new_rows, query)
+            scored_rows.append(new_rows)
+            scored.append(new_scores)
+
+            merged_rows = np.concatenate((beam_rows, new_rows))
+            merged_scores = np.concatenate((beam_scores, new_scores))
+            merged_followed = np.concatenate((followed, np.zeros(len(new_rows), dtype=bool)))
+            keep = top_n(merged_scores[None, :], beam)[0]
+            beam_rows, beam_scores, followed = merged_rows[keep], merged_scores[keep], merged_followed[keep]
+
+        # Removed and excluded movies still help to find the way, but are not returned
+        rows, row_scores = np.concatenate(scored_rows), np.concatenate(scored)
+        order = np.argsort(rows)
+        rows, row_scores = rows[order], row_scores[order]
+        usable = np.ones(len(rows), dtype=bool) if active is None else active[rows].copy()
+        if exclude is not None:
+            usable &= ~np.isin(rows, exclude[i])
+        if np.count_nonzero(usable) < n:
+            one_exclude = None if exclude is None else [exclude[i]]
+            indices[i], scores[i] = exact_search(matrix, vector, n, active, one_exclude,
+                                                 matrix_t=matrix_t)
+            continue
+
+        rows, row_scores = rows[usable], row_scores[usable]
+        top = top_n(row_scores[None, :], n)[0]
+        indices[i], scores[i] = rows[top], row_scores[top]
+
+    return indices, scores
+
+# =============================================================================
+# 7. MODEL ARTIFACTS
+# =============================================================================
+# Building the model (fitting TF-IDF and finding every movie's neighbours) is
+# slow for a big catalog, so it is done once, offline:
+#
+#     python recommender.py --build
+#
+# This saves the arrays to MODEL_DIR as .npy files. Serving processes open them
+# with memory mapping: nothing is refitted or copied, start-up takes
+# milliseconds, and every process on the machine shares the same pages of
+# memory. Without saved artifacts, the model is built in memory from movies_data.
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model")
+MODEL_VERSION = 3   # Bump when the files written by Model.save() change
+
+def _pack_strings(strings):
+    """
+    Stores strings as one UTF-8 byte array plus the offset where each one starts.
+    """
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+class PackedStrings:
+    """
+    A read-only list of strings kept in the arrays made by _pack_strings(),
+    which can be memory-mapped (a plain list of strings cannot).
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.data[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+def _widen(matrix, columns):
+    # New terms add columns to the vocabulary; older rows simply have no counts there
+    return sp.csr_matrix((matrix.data, matrix.indices, matrix.indptr),
+                         shape=(matrix.shape[0], columns), copy=False)
+
+class Model:
+    """
+    Everything needed to recommend movies: their display names, TF-IDF vectors
+    and term counts, neighbour lists, the vocabulary with the number of movies
+    each term appears in, which rows are still in the catalog, and the title index.
+    """
+
+    def __init__(self, names, tfidf_matrix, counts, neighbour_indices, neighbour_scores,
+                 terms, document_counts, active, title_index=None, directory=None):
+        self.names = names
+        self.tfidf_matrix = tfidf_matrix
+        self.counts = counts                    # Raw term counts, same layout as tfidf_matrix
+        self.neighbour_indices = neighbour_indices
+        self.neighbour_scores = neighbour_scores
+        self.terms = terms
+        self.document_counts = document_counts  # Movies each term appears in
+        self.active = active                    # False for removed movies
+        self.movie_count = int(np.count_nonzero(active))
+        self.directory = directory
+        self.title_index = title_index
+        self._vectorizer = None
+        self._ann = None
+        self._tfidf_matrix_t = None
+        self._writable = directory is None
+
+    def __len__(self):
+        return self.tfidf_matrix.shape[0]
+
+    @classmethod
+    def build(cls, df):
+        """
+        Builds the model from a DataFrame with 'title' and 'tags' columns.
+        """
+        return cls.build_from_chunks([df])
+
+    @classmethod
+    def build_from_chunks(cls, chunks):
+        """
+        Builds the model from DataFrame chunks, e.g. from read_catalog().
+        Only the term counts of each chunk are kept, not its text.
+        """
+        counter = TermCounter()
+        pieces = []
+        titles = []
+        keys = []
+        for chunk in chunks:
+            pieces.append(counter.count(chunk['tags']))
+            titles.extend(str(title) for title in chunk['title'])
+            chunk_keys = _title_keys(chunk)
+            if chunk_keys is None:
+                keys = None
+            elif keys is not None:
+                keys.extend(chunk_keys)
+
+        width = len(counter.terms)
+        counts = sp.vstack([_widen(piece, width) for piece in pieces], format='csr')
+        idf = idf_weights(counter.document_counts, counts.shape[0])
+        tfidf_matrix = tfidf_rows(counts, idf)
+        neighbour_indices, neighbour_scores = build_neighbours(tfidf_matrix)
+        title_index = TitleIndex(titles, keys)
+        return cls(title_index.names, tfidf_matrix, counts, neighbour_indices, neighbour_scores,
+                   counter.terms, np.array(counter.document_counts, dtype=np.int64),
+                   np.ones(counts.shape[0], dtype=bool), title_index)
+
+    @property
+    def ann(self):
+        """
+        The LSH index, loaded from the model directory or built on first use.
+        """
+        if self._ann is None:
+            path = os.path.join(self.directory or "", "ann_rows.npy")
+            if self._saved(path):
+                with open(os.path.join(self.directory, "meta.json"), encoding="utf-8") as f:
+                    params = json.load(f)["ann"]
+                self._ann = LSHIndex(np.load(path, mmap_mode="r"),
+                                     np.load(os.path.join(self.directory, "ann_buckets.npy"), mmap_mode="r"),
+                                     **params)
+            else:
+                self._ann = LSHIndex.build(self.tfidf_matrix)
+        return self._ann
+
+    @property
+    def tfidf_matrix_t(self):
+        # The transposed matrix makes scoring a query against the catalog cheap:
+        # only the movies sharing a term with the query are touched. It is as
+        # big as the matrix itself, so serving processes map the saved copy.
+        if self._tfidf_matrix_t is None:
+            if self._saved(os.path.join(self.directory or "", "tfidf_t_data.npy")):
+                def array(name):
+                    return np.load(os.path.join(self.directory, name + ".npy"), mmap_mode="r")
+                self._tfidf_matrix_t = sp.csr_matrix(
+                    (array("tfidf_t_data"), array("tfidf_t_indices"), array("tfidf_t_indptr")),
+                    shape=self.tfidf_matrix.shape[::-1], copy=False)
+            else:
+                self._tfidf_matrix_t = self.tfidf_matrix.T.tocsr()
+        return self._tfidf_matrix_t
+
+    def _saved(self, path):
+        # Files in the model directory only describe the model until it is changed
+        return bool(self.directory) and not self._writable and os.path.exists(path)
+
+    @property
+    def idf(self):
+        return idf_weights(self.document_counts, self.movie_count)
+
+    @property
+    def vectorizer(self):
+        """
+        A TfidfVectorizer for new text, rebuilt from the saved vocabulary without refitting.
+        """
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            vocabulary = {term: column for column, term in enumerate(self.terms)}
+            self._vectorizer = TfidfVectorizer(**TFIDF_OPTIONS, vocabulary=vocabulary)
+            self._vectorizer.idf_ = self.idf
+        return self._vectorizer
+
+    # Incremental updates
+    # -------------------
+    # Adding or removing movies updates the term statistics and only the
+    # neighbour lists that change: a new movie enters the lists it beats, and
+    # lists that contained a removed movie are recomputed. The idf weights of
+    # movies already in the model are not recomputed, because that would mean
+    # redoing everything; they drift a little as the catalog changes, so run
+    # --build now and then to refresh them.
+
+    def _make_writable(self):
+        # A loaded model is memory-mapped read-only; updates work on a private copy
+        if self._writable:
+            return
+        title_index = self.title_index.thaw(self.active)
+        data = np.array(self.tfidf_matrix.data)
+        indices = np.array(self.tfidf_matrix.indices)
+        indptr = np.array(self.tfidf_matrix.indptr)
+        self.tfidf_matrix = sp.csr_matrix((data, indices, indptr), shape=self.tfidf_matrix.shape)
+        self.counts = sp.csr_matrix((np.array(self.counts.data), indices, indptr), shape=self.counts.shape)
+        self.neighbour_indices = np.array(self.neighbour_indices)
+        self.neighbour_scores = np.array(self.neighbour_scores)
+        self.terms = list(self.terms)
+        self.document_counts = np.array(self.document_counts)
+        self.active = np.array(self.active)
+        self.title_index = title_index
+        self.names = title_index.names
+        self._writable = True
+
+    def add_movies(self, df):
+        """
+        Adds the movies in a DataFrame with 'title' and 'tags' columns.
+        Returns their rows.
+        """
+        self._make_writable()
+        self._vectorizer = None
+        self._ann = None   # Rebuilt on next use; removed movies are just skipped
+        self._tfidf_matrix_t = None
+        first = len(self)
+        rows = np.arange(first, first + len(df))
+
+        counter = TermCounter(self.terms, self.document_counts)
+        new_counts = counter.count(df['tags'])
+        self.terms = counter.terms
+        self.document_counts = np.array(counter.document_counts, dtype=np.int64)
+        self.movie_count += len(df)
+        new_rows = tfidf_rows(new_counts, self.idf)
+
+        width = len(self.terms)
+        self.tfidf_matrix = sp.vstack([_widen(self.tfidf_matrix, width), new_rows], format='csr')
+        self.counts = sp.csr_matrix(
+            (np.concatenate((self.counts.data, new_counts.data)),
+             self.tfidf_matrix.indices, self.tfidf_matrix.indptr), shape=self.tfidf_matrix.shape)
+        self.active = np.concatenate((self.active, np.ones(len(df), dtype=bool)))
+        self.title_index.add(df['title'].astype(str), _title_keys(df))
+        self.names = self.title_index.names
+
+        k = self.neighbour_indices.shape[1]
+        if k < min(TOP_K, len(self) - 1):
+            # The catalog was too small for full neighbour lists; now it is not
+            self.neighbour_indices, self.neighbour_scores = build_neighbours(
+                self.tfidf_matrix, active=self.active)
+            return rows
+
+        # The new movies' own neighbour lists
+        new_indices, new_scores = build_neighbours(self.tfidf_matrix, k, rows=rows, active=self.active)
+
+        # Older movies take a new movie into their list if it beats their last neighbour.
+        # New movies have higher rows, so on equal scores the older neighbour stays first.
+        block_rows = max(1, BLOCK_CELLS // len(df))
+        for start in range(0, first, block_rows):
+            end = min(start + block_rows, first)
+            similarity = (self.tfidf_matrix[start:end] @ new_rows.T).toarray().astype(np.float32)
+            changed = (similarity > self.neighbour_scores[start:end, -1:]).any(axis=1)
+            changed &= self.active[start:end]
+            if not changed.any():
+                continue
+            changed_rows = np.flatnonzero(changed) + start
+            scores = np.hstack((self.neighbour_scores[changed_rows], similarity[changed]))
+            indices = np.hstack((self.neighbour_indices[changed_rows],
+                                 np.broadcast_to(rows.astype(np.int32), (len(changed_rows), len(rows)))))
+            best = top_n(scores, k)
+            self.neighbour_scores[changed_rows] = np.take_along_axis(scores, best, axis=1)
+            self.neighbour_indices[changed_rows] = np.take_along_axis(indices, best, axis=1)
+
+        self.neighbour_indices = np.vstack((self.neighbour_indices, new_indices))
+        self.neighbour_scores = np.vstack((self.neighbour_scores, new_scores))
+        return rows
+
+    def remove_rows(self, rows):
+        """
+        Removes the movies in these rows. Row numbers of other movies do not change.
+        """
+        self._make_writable()
+        self._vectorizer = None
+        self._tfidf_matrix_t = None
+        rows = np.unique(np.asarray(rows, dtype=np.intp))
+        rows = rows[self.active[rows]]
+        if not len(rows):
+            return
+
+        for row in rows:
+            start, end = self.counts.indptr[row], self.counts.indptr[row + 1]
+            np.subtract.at(self.document_counts, self.counts.indices[start:end], 1)
+            self.counts.data[start:end] = 0
+            self.tfidf_matrix.data[start:end] = 0
+        self.active[rows] = False
+        self.movie_count -= len(rows)
+        self.title_index.remove(rows)
+        self.neighbour_indices[rows] = -1
+        self.neighbour_scores[rows] = -np.inf
+
+        # Movies that listed a removed movie need a new list
+        affected = np.flatnonzero(np.isin(self.neighbour_indices, rows).any(axis=1) & self.active)
+        if len(affected):
+            indices, scores = build_neighbours(self.tfidf_matrix, self.neighbour_indices.shape[1],
+                                               rows=affected, active=self.active)
+            self.neighbour_indices[affected] = indices
+            self.neighbour_scores[affected] = scores
+
+    def _row_of(self, name):
+        rows = self.title_index.lookup(name)
+        if len(rows) != 1:
+            problem = "is shared by several movies" if rows else "was not found"
+            raise ValueError(f"Movie '{name}' {problem}")
+        return rows[0]
+
+    def remove_movies(self, names):
+        """
+        Removes movies by name (as shown, e.g. "Titanic (1997)" for duplicate titles).
+        """
+        self.remove_rows([self._row_of(name) for name in names])
+
+    def update_movies(self, df):
+        """
+        Adds the movies in a DataFrame, replacing movies already in the model
+        with the same title (and year or id, if the DataFrame has one).
+        Returns the new rows.
+        """
+        self._make_writable()
+        keys = _title_keys(df) or [None] * len(df)
+        replaced = []
+        for title, key in zip(df['title'].astype(str), keys):
+            rows = self.title_index.lookup(title if key is None else f"{title} ({key})")
+            if not rows and key is not None:
+                # Only one movie with this title, so it is not shown with its key.
+                # Keys are compared as text: a saved model stores them as text
+                rows = [row for row in self.title_index.lookup(title)
+                        if str(self.title_index.keys[row]) == str(key)]
+            replaced.extend(rows)
+        self.remove_rows(replaced)
+        return self.add_movies(df)
+
+    # Saving and loading
+    # ------------------
+
+    def save(self, directory=MODEL_DIR):
+        """
+        Writes the model to `directory`, replacing any model already there.
+        Processes still using the old files keep working until they reload.
+        """
+        temp = directory + ".tmp"
+        shutil.rmtree(temp, ignore_errors=True)
+        os.makedirs(temp)
+
+        names, name_offsets = _pack_strings(self.names)
+        terms, term_offsets = _pack_strings(self.terms)
+        arrays = {
+            "tfidf_data": self.tfidf_matrix.data,
+            "tfidf_indices": self.tfidf_matrix.indices,
+            "tfidf_indptr": self.tfidf_matrix.indptr,
+            "count_data": self.counts.data,
+            "neighbour_indices": self.neighbour_indices,
+            "neighbour_scores": self.neighbour_scores,
+            "names": names,
+            "name_offsets": name_offsets,
+            "terms": terms,
+            "term_offsets": term_offsets,
+            "document_counts": np.asarray(self.document_counts),
+            "active": self.active,
+            "ann_rows": self.ann.sorted_rows,
+            "ann_buckets": self.ann.sorted_buckets,
+            "tfidf_t_data": self.tfidf_matrix_t.data,
+            "tfidf_t_indices": self.tfidf_matrix_t.indices,
+            "tfidf_t_indptr": self.tfidf_matrix_t.indptr,
+        }
+        if isinstance(self.title_index, MappedTitleIndex):
+            # Unchanged since loading: copy its arrays over as they are
+            arrays.update({name: np.load(os.path.join(self.directory, name + ".npy"), mmap_mode="r")
+                           for name in TITLE_INDEX_ARRAYS})
+        else:
+            arrays.update(self.title_index.to_arrays())
+        for name, array in arrays.items():
+            np.save(os.path.join(temp, name + ".npy"), array)
+        with open(os.path.join(temp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"version": MODEL_VERSION, "shape": list(self.tfidf_matrix.shape),
+                       "ann": {"tables": self.ann.tables, "bits": self.ann.bits, "seed": self.ann.seed}}, f)
+
+        # Swap the finished directory into place
+        old = directory + ".old"
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(directory):
+            os.replace(directory, old)
+        os.replace(temp, directory)
+        shutil.rmtree(old, ignore_errors=True)
+        self.directory = directory
+
+    @classmethod
+    def load(cls, directory=MODEL_DIR):
+        """
+        Opens a saved model. The arrays are memory-mapped read-only, not read into memory.
+        """
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != MODEL_VERSION:
+            raise ValueError(f"Model in {directory} is from another version; rebuild it with --build")
+
+        def array(name):
+            return np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+
+        shape = tuple(meta["shape"])
+        indices, indptr = array("tfidf_indices"), array("tfidf_indptr")
+        tfidf_matrix = sp.csr_matrix((array("tfidf_data"), indices, indptr), shape=shape, copy=False)
+        counts = sp.csr_matrix((array("count_data"), indices, indptr), shape=shape, copy=False)
+        names = PackedStrings(array("names"), array("name_offsets"))
+        title_index = MappedTitleIndex(names, {name: array(name) for name in TITLE_INDEX_ARRAYS})
+        return cls(names, tfidf_matrix, counts,
+                   array("neighbour_indices"), array("neighbour_scores"),
+                   PackedStrings(array("terms"), array("term_offsets")),
+                   array("document_counts"), array("active"), title_index, directory)
+
+def load_model(directory=MODEL_DIR):
+    """
+    Loads the saved model from `directory`, or builds one from movies_data if there is none.
+    """
+    if os.path.exists(os.path.join(directory, "meta.json")):
+        return Model.load(directory)
+    return Model.build(movies_dataframe())
+
+# The model used by recommend(); loaded on first use, replaced by use_model()
+model = None
+
+def current_model():
+    """
+    Returns the model used by recommend(), loading it the first time.
+    """
+    global model
+    if model is None:
+        model = load_model()
+    return model
+
+def use_model(directory):
+    global model
+    model = Model.load(directory)
+
+# =============================================================================
+# 8. RECOMMENDATION FUNCTION
+# =============================================================================
+
+def find_movie(movie_name):
+    """
+    Looks up a movie by name.
     
     Returns:
-    - list: A list of recommended movie titles.
+    - int: The movie's row in the model, or
+    - str: An error message if the name is empty, unknown or shared by several movies.
     """
+    model = current_model()
     
     # Handle empty input
     if not movie_name or not movie_name.strip():
         return "Error: Please provide a movie name."
     
-    # Convert to title case for better matching
+    title_index = model.title_index
+    rows = title_index.lookup(movie_name)
+    if len(rows) == 1:
+        return rows[0]
+    
+    # Convert to title case for the error messages
     movie_name = movie_name.strip().title()
     
-    # Check if movie exists in dataset
-    if movie_name not in movies_df['title'].values:
-        return f"Error: '{movie_name}' not found in the database. Please check the spelling."
+    if rows:
+        choices = ", ".join(title_index.names[row] for row in rows)
+        return f"Error: There are several movies called '{movie_name}'. Please choose one of: {choices}."
+    
+    suggestions = title_index.suggest(movie_name)
+    if suggestions:
+        return f"Error: '{movie_name}' not found in the database. Did you mean: {', '.join(suggestions)}?"
+    return f"Error: '{movie_name}' not found in the database. Please check the spelling."
+
+def most_similar(movie_indices, n):
+    """
+    Returns an array with the n most similar movies for each of the given movies.
+    """
+    model = current_model()
+    movie_indices = np.asarray(movie_indices, dtype=np.intp)
+    n = max(0, min(n, model.movie_count - 1))
     
-    # Get the index of the movie
-    movie_idx = movies_df[movies_df['title'] == movie_name].index[0]
+    # Usually the answer is already in the precomputed neighbour lists
+    if n <= model.neighbour_indices.shape[1]:
+        return model.neighbour_indices[movie_indices, :n]
     
-    # Get similarity scores for this movie with all other movies
-    similarity_scores = list(enumerate(similarity_matrix[movie_idx]))
+    # For longer lists, score these movies against the whole catalog,
+    # masking out the movie itself instead of assuming it comes first
+    indices, scores = exact_search(model.tfidf_matrix, model.tfidf_matrix[movie_indices], n,
+                                   active=model.active, exclude=movie_indices[:, None],
+                                   matrix_t=model.tfidf_matrix_t)
+    return indices
+
+def recommend_batch(movie_names, n=5):
+    """
+    Recommends movies for several movies at once.
     
-    # Sort movies by similarity score (descending order)
-    # Skip the first one because it's the movie itself (similarity = 1.0)
-    similarity_scores = sorted(similarity_scores, key=lambda x: x[1], reverse=True)[1:n+1]
+    Parameters:
+    - movie_names (list of str): The movies to base recommendations on.
+    - n (int): Number of recommendations per movie (default: 5).
     
-    # Get movie indices
-    movie_indices = [i[0] for i in similarity_scores]
+    Returns:
+    - list: One entry per movie name, each either a list of recommended
+      titles or an error message, as returned by recommend().
+    """
+    model = current_model()
+    results = [find_movie(name) for name in movie_names]
+    found = [i for i, result in enumerate(results) if not isinstance(result, str)]
     
-    # Return the top N most similar movies
-    recommended_movies = movies_df['title'].iloc[movie_indices].tolist()
+    if found:
+        similar = most_similar([results[i] for i in found], n)
+        for i, movie_indices in zip(found, similar):
+            # Neighbour lists end with -1 when there are not enough movies left
+            results[i] = [model.names[j] for j in movie_indices if j >= 0]
     
-    return recommended_movies
+    return results
+
+def recommend(movie_name, n=5):
+    """
+    Recommends movies similar to the given movie.
+    
+    Parameters:
+    - movie_name (str): The name of the movie to base recommendations on.
+    - n (int): Number of recommendations to return (default: 5).
+    
+    Returns:
+    - list: A list of recommended movie titles.
+    """
+    return recommend_batch([movie_name], n)[0]
+
+ANN_MIN_MOVIES = 100000   # Smaller catalogs are searched exactly; that is fast enough
+
+def similar_to_vectors(vectors, n, exclude=None, exact=None):
+    """
+    Returns the rows of the n movies most similar to each query vector.
+    exact=True compares with every movie, exact=False searches approximately,
+    and the default picks by catalog size (see ANN_MIN_MOVIES).
+    """
+    model = current_model()
+    n = max(0, min(n, model.movie_count))
+    if exact is None:
+        exact = model.movie_count < ANN_MIN_MOVIES
+    if exact:
+        indices, scores = exact_search(model.tfidf_matrix, vectors, n, model.active, exclude,
+                                       matrix_t=model.tfidf_matrix_t)
+    else:
+        indices, scores = ann_search(model.tfidf_matrix, model.neighbour_indices, model.ann,
+                                     vectors, n, model.active, exclude, model.tfidf_matrix_t)
+    return indices
+
+def recommend_by_text_batch(texts, n=5, exact=None):
+    """
+    Recommends movies matching each of several free-text descriptions.
+    
+    Returns:
+    - list: One entry per text, each either a list of titles or an error message.
+    """
+    model = current_model()
+    vectors = model.vectorizer.transform(texts)
+    similar = similar_to_vectors(vectors, n, exact=exact)
+    results = []
+    for vector, movie_indices in zip(vectors, similar):
+        if vector.nnz == 0:
+            results.append("Error: None of those words appear in the movie database.")
+        else:
+            results.append([model.names[j] for j in movie_indices if j >= 0])
+    return results
+
+def recommend_by_text(text, n=5, exact=None):
+    """
+    Recommends movies matching a free-text description, e.g. "a heist in space".
+    """
+    return recommend_by_text_batch([text], n, exact)[0]
+
+def recommend_by_profile(movie_names, n=5, exact=None):
+    """
+    Recommends movies for someone who liked all of the given movies.
+    The movies themselves are never recommended.
+    
+    Returns:
+    - list: A list of recommended movie titles, or an error message.
+    """
+    model = current_model()
+    rows = [find_movie(name) for name in movie_names]
+    errors = [row for row in rows if isinstance(row, str)]
+    if errors:
+        return errors[0]
+    if not rows:
+        return "Error: Please provide at least one movie name."
+    
+    # The profile is the average direction of the movies' vectors
+    profile = sp.csr_matrix(model.tfidf_matrix[rows].mean(axis=0))
+    norm = np.sqrt(profile.multiply(profile).sum())
+    if norm == 0:
+        return "Error: These movies have no words to compare with."
+    profile = profile / norm
+    
+    similar = similar_to_vectors(profile, n, exclude=[np.array(rows)], exact=exact)[0]
+    return [model.names[j] for j in similar if j >= 0]
 
 # =============================================================================
-# 6. MAIN PROGRAM
+# 9. MAIN PROGRAM
 # =============================================================================
 
+MAX_LISTED = 50   # Movies listed at start-up
+
 def main():
     """
     Main function to run the recommendation system.
     """
+    model = current_model()
     print("=" * 60)
     print("       MOVIE RECOMMENDATION SYSTEM")
     print("=" * 60)
     print("\nAvailable movies in the database:")
     print("-" * 60)
     
-    for idx, movie in enumerate(movies_df['title'], 1):
-        print(f"{idx}. {movie}")
+    for idx, row in enumerate(np.flatnonzero(model.active), 1):
+        print(f"{idx}. {model.names[row]}")
+        if idx == MAX_LISTED and model.movie_count > MAX_LISTED:
+            print(f"... and {model.movie_count - MAX_LISTED} more")
+            break
     
     print("\n" + "=" * 60)
     
@@ -160,4 +1403,35 @@ def main():
                 print(f"{idx}. {movie}")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Content-based movie recommendation system")
+    parser.add_argument("--build", action="store_true",
+                        help="build the model and save it to the model directory")
+    parser.add_argument("--catalog", metavar="PATH",
+                        help="with --build: read the movies from this CSV or Parquet file")
+    parser.add_argument("--add", metavar="PATH",
+                        help="add (or replace) the movies in this CSV or Parquet file in the saved model")
+    parser.add_argument("--remove", metavar="TITLE", action="append", default=[],
+                        help="remove this movie from the saved model (can be repeated)")
+    parser.add_argument("--model-dir", default=MODEL_DIR,
+                        help="where the model is saved and loaded (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.build:
+        chunks = read_catalog(args.catalog) if args.catalog else [movies_dataframe()]
+        Model.build_from_chunks(chunks).save(args.model_dir)
+        print(f"Model written to {args.model_dir}")
+    elif args.add or args.remove:
+        model = Model.load(args.model_dir)
+        if args.remove:
+            model.remove_movies(args.remove)
+        if args.add:
+            for chunk in read_catalog(args.add):
+                model.update_movies(chunk)
+        model.save(args.model_dir)
+        print(f"Model updated: {model.movie_count} movies")
+    else:
+        if args.model_dir != MODEL_DIR:
+            model = load_model(args.model_dir)
+        main()
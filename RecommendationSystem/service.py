@@ -0,0 +1,265 @@
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+import recommender
+from recommender import (ann_search, exact_search, recommend_batch, recommend_by_profile,
+                         recommend_by_text_batch, tfidf_rows, top_n, use_model)
+
+# =============================================================================
+# 1. SERVICE SETTINGS
+# =============================================================================
+# A small HTTP service that answers with JSON. Try it with:
+#   curl "localhost:8080/recommend?title=Inception&n=3"
+#   curl "localhost:8080/recommend/text?q=haunted+house&n=3"
+#   curl "localhost:8080/recommend/profile?title=Inception&title=Thor"
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_N = 5
+MAX_N = 100                 # Most recommendations returned per request
+BATCH_WINDOW = 0.002        # Seconds to wait for more requests to answer together
+MAX_BATCH = 64              # Most requests answered in one batch
+MAX_REQUEST_LENGTH = 8192   # Longest request line or header accepted
+
+# =============================================================================
+# 2. REQUEST BATCHING
+# =============================================================================
+# Scoring 64 queries in one call is much cheaper than 64 separate calls: the
+# vectorizer, the sparse matrix product and numpy's per-call overhead are
+# shared. So requests arriving at about the same time are collected for up to
+# BATCH_WINDOW seconds and answered together. The work runs in one background
+# thread, which keeps the event loop free to accept more requests meanwhile.
+
+class Batcher:
+    """
+    Collects (query, n) requests and answers them with handle_batch(queries, n),
+    which must return one result per query.
+    """
+
+    def __init__(self, handle_batch, executor, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.handle_batch = handle_batch
+        self.executor = executor
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = []   # (query, n, future)
+        self._task = None
+
+    async def submit(self, query, n):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((query, n, future))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self.pending:
+            if len(self.pending) < self.max_batch:
+                await asyncio.sleep(self.window)
+            batch, self.pending = self.pending[:self.max_batch], self.pending[self.max_batch:]
+
+            # Requests with the same n can share one call
+            by_n = {}
+            for query, n, future in batch:
+                by_n.setdefault(n, []).append((query, future))
+            for n, items in by_n.items():
+                queries = [query for query, future in items]
+                try:
+                    results = await loop.run_in_executor(self.executor, self.handle_batch, queries, n)
+                except Exception as error:
+                    for query, future in items:
+                        if not future.done():
+                            future.set_exception(error)
+                    continue
+                for (query, future), result in zip(items, results):
+                    if not future.done():
+                        future.set_result(result)
+
+def _profiles_batch(title_lists, n):
+    return [recommend_by_profile(titles, n) for titles in title_lists]
+
+# =============================================================================
+# 3. HTTP SERVICE
+# =============================================================================
+
+class RecommendationService:
+    """
+    Serves recommendations over HTTP from one asyncio event loop.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, batch_window=BATCH_WINDOW):
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.batchers = {
+            "/recommend": Batcher(recommend_batch, self.executor, batch_window),
+            "/recommend/text": Batcher(recommend_by_text_batch, self.executor, batch_window),
+            "/recommend/profile": Batcher(_profiles_batch, self.executor, batch_window),
+        }
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                  limit=MAX_REQUEST_LENGTH)
+        # With port=0 the system chose a port; tests and scripts read it from here
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=False)
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Recommendation service listening on http://{self.host}:{self.port}")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def answer(self, path, params):
+        """
+        Returns (status, body) for a request path and its query parameters.
+        """
+        if path == "/health":
+            return 200, {"status": "ok", "movies": recommender.current_model().movie_count}
+        if path not in self.batchers:
+            return 404, {"error": f"Unknown path {path}"}
+
+        try:
+            n = min(int(params.get("n", [DEFAULT_N])[0]), MAX_N)
+        except ValueError:
+            return 400, {"error": "n must be a number"}
+        if n < 1:
+            return 400, {"error": "n must be at least 1"}
+
+        if path == "/recommend/text":
+            query = params.get("q", [""])[0]
+        elif path == "/recommend/profile":
+            query = params.get("title", [])
+        else:
+            query = params.get("title", [""])[0]
+
+        result = await self.batchers[path].submit(query, n)
+        if isinstance(result, str):
+            return 400, {"error": result}
+        return 200, {"recommendations": result}
+
+    async def _handle(self, reader, writer):
+        try:
+            try:
+                request_line = await reader.readline()
+                # Only the request line matters; read past the headers up to the blank line
+                while (await reader.readline()).strip():
+                    pass
+            except ValueError:
+                # readline() raises ValueError for lines longer than MAX_REQUEST_LENGTH
+                await self._respond(writer, 400, {"error": "Request line or header too long"})
+                return
+
+            parts = request_line.decode(errors="replace").split()
+            url = urlsplit(parts[1] if len(parts) > 1 else "/")
+            path = url.path.rstrip("/") or "/"
+            try:
+                status, body = await self.answer(path, parse_qs(url.query))
+            except Exception as error:
+                # A failed batch fails every request in it; each still gets an answer
+                print(f"Error answering {path}: {error!r}", file=sys.stderr)
+                status, body = 500, {"error": "Internal error while computing recommendations"}
+            await self._respond(writer, status, body)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, body):
+        data = json.dumps(body).encode()
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}[status]
+        writer.write(f"HTTP/1.0 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+        await writer.drain()
+
+# =============================================================================
+# 4. RECALL VS LATENCY BENCHMARK
+# =============================================================================
+# Queries are made from real movies with half of their words dropped. The
+# exact answer comes from scikit-learn's cosine_similarity against the whole
+# catalog; recall is the share of those top-n movies that the graph search finds.
+
+def benchmark_ann(queries=200, n=10, seed=0):
+    """
+    Returns a list of (method, recall, milliseconds per query).
+    """
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    model = recommender.current_model()
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(np.flatnonzero(model.active), size=min(queries, model.movie_count), replace=False)
+
+    # Drop about half the words of each movie to get a query
+    counts = model.counts[rows].tocsr(copy=True)
+    counts.data[rng.random(len(counts.data)) < 0.5] = 0
+    counts.eliminate_zeros()
+    vectors = tfidf_rows(counts, model.idf)
+
+    similarity = cosine_similarity(vectors, model.tfidf_matrix)
+    similarity[:, ~model.active] = -np.inf
+    truth = top_n(similarity, n)
+
+    def measure(search):
+        start = time.perf_counter()
+        found = search()
+        seconds = time.perf_counter() - start
+        recall = np.mean([len(np.intersect1d(f, t)) / len(t) for f, t in zip(found, truth)])
+        return recall, seconds / len(rows) * 1000
+
+    matrix_t = model.tfidf_matrix_t
+    results = [("exact", *measure(lambda: [exact_search(model.tfidf_matrix, vector, n, model.active,
+                                                        matrix_t=matrix_t)[0][0] for vector in vectors]))]
+    for beam in (n, 2 * n, 4 * n, 8 * n):
+        results.append((f"ANN beam {beam}", *measure(lambda: ann_search(
+            model.tfidf_matrix, model.neighbour_indices, model.ann, vectors, n, model.active,
+            matrix_t=matrix_t, beam=beam)[0])))
+    return results
+
+# =============================================================================
+# 5. MAIN PROGRAM
+# =============================================================================
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HTTP service for the movie recommender")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--model-dir", help="serve the model saved in this directory")
+    parser.add_argument("--batch-window", type=float, default=BATCH_WINDOW,
+                        help="seconds to wait for more requests to answer together")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compare approximate search recall and latency with exact search, then exit")
+    parser.add_argument("--queries", type=int, default=200, help="queries for --benchmark")
+    args = parser.parse_args()
+
+    if args.model_dir:
+        use_model(args.model_dir)
+    else:
+        # Load before serving so the first requests don't wait for it
+        recommender.current_model()
+
+    if args.benchmark:
+        print(f"{'Method':24} | Recall@10 | ms/query")
+        for method, recall, milliseconds in benchmark_ann(args.queries):
+            print(f"{method:24} | {recall:9.3f} | {milliseconds:8.3f}")
+    else:
+        service = RecommendationService(args.host, args.port, args.batch_window)
+        try:
+            asyncio.run(service.serve_forever())
+        except KeyboardInterrupt:
+            print("\nRecommendation service stopped.")
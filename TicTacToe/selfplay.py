@@ -0,0 +1,237 @@
+import math
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from tictactoe import AI, EMPTY, HUMAN, Game, check_winner, choose_move, get_available_moves
+
+# Self-play harness
+# -----------------
+# Plays many games without any input or output and reports how fast they ran.
+# The AI plays against a random opponent or against itself, taking turns at
+# going first. Because the AI is unbeatable, any game it loses is a bug, so the
+# harness doubles as a correctness check.
+
+CHUNK_SIZE = 1000   # Games per task handed to a worker process
+
+class MoveTimes:
+    """
+    How long AI moves took. Each time is counted under the power of two (in
+    microseconds) just above it, which is all the precision the report needs.
+    """
+
+    def __init__(self):
+        self.buckets = Counter()   # k -> moves that took under 2**k microseconds
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        self.buckets[math.frexp(seconds * 1e6)[1]] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, q):
+        # Upper end of the bucket holding the q-th fastest move, in seconds
+        running = 0
+        for k in sorted(self.buckets):
+            running += self.buckets[k]
+            if running >= q * self.count:
+                return 2.0 ** k / 1e6
+        return 0.0
+
+    def merge(self, other):
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.total += other.total
+
+class SelfPlayReport:
+    """
+    Totals for a batch of games. Reports from different workers are merged.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.ai_wins = 0
+        self.ai_losses = 0
+        self.draws = 0
+        self.nodes = 0
+        self.move_times = MoveTimes()   # AI moves only
+        self.lost_games = []                     # Move lists of games the AI lost
+        self.seconds = 0.0
+
+    def merge(self, other):
+        self.games += other.games
+        self.ai_wins += other.ai_wins
+        self.ai_losses += other.ai_losses
+        self.draws += other.draws
+        self.nodes += other.nodes
+        self.move_times.merge(other.move_times)
+        self.lost_games.extend(other.lost_games)
+
+    def summary(self):
+        seconds = self.seconds or 1e-9
+        times = self.move_times
+        return "\n".join([
+            f"Games:        {self.games} in {self.seconds:.2f}s ({self.games / seconds:,.0f} games/sec)",
+            f"Results:      {self.ai_wins} AI wins, {self.draws} draws, {self.ai_losses} AI losses",
+            f"Nodes:        {self.nodes} ({self.nodes / seconds:,.0f} nodes/sec)",
+            f"AI move time: mean {times.total / max(times.count, 1) * 1e6:.1f}us, "
+            f"p50 {times.percentile(0.50) * 1e6:.1f}us, "
+            f"p95 {times.percentile(0.95) * 1e6:.1f}us, "
+            f"p99 {times.percentile(0.99) * 1e6:.1f}us",
+        ])
+
+# Playing games
+# -------------
+
+def random_move(board, player, game, rng):
+    return rng.choice(get_available_moves(board)), 0
+
+def engine_player(use_table=True, time_budget=None):
+    """
+    Returns a player function that asks the engine for its move.
+    """
+    def play(board, player, game, rng):
+        return choose_move(board, player, game, use_table, time_budget)
+    return play
+
+def play_game(x_player, o_player, game, rng, report, ai_sides):
+    """
+    Plays one game between two player functions and records it in `report`.
+    ai_sides holds the marks played by the AI; only their moves are timed.
+    A game won against an AI side counts as an AI loss, even if the winner
+    was the AI as well.
+    """
+    board = [EMPTY] * game.cells
+    players = {HUMAN: x_player, AI: o_player}
+    moves = []
+    turn = HUMAN
+    for _ in range(game.cells):
+        start = time.perf_counter()
+        move, nodes = players[turn](board, turn, game, rng)
+        seconds = time.perf_counter() - start
+        if turn in ai_sides:
+            report.move_times.add(seconds)
+            report.nodes += nodes
+
+        board[move] = turn
+        moves.append(move)
+        if check_winner(board, turn, game):
+            # When the AI plays both sides, one of them lost: that is a failure too
+            loser = AI if turn == HUMAN else HUMAN
+            if loser in ai_sides:
+                report.ai_losses += 1
+                report.lost_games.append(moves)
+            else:
+                report.ai_wins += 1
+            break
+        turn = AI if turn == HUMAN else HUMAN
+    else:
+        report.draws += 1
+    report.games += 1
+
+_games = {}   # (size, win_length) -> Game, reused within a worker process
+
+def play_games(count, first_game, opponent, size, win_length, use_table, time_budget, seed):
+    """
+    Plays `count` games and returns their SelfPlayReport. Game number i uses a
+    random generator seeded with (seed, i), so results do not depend on how
+    the games were split between workers. The AI plays X in even-numbered games.
+    """
+    key = (size, win_length)
+    if key not in _games:
+        _games[key] = Game(size, win_length)
+    game = _games[key]
+
+    engine = engine_player(use_table, time_budget)
+    report = SelfPlayReport()
+    for number in range(first_game, first_game + count):
+        rng = random.Random(f"{seed}:{number}")
+        if opponent == "ai":
+            play_game(engine, engine, game, rng, report, (HUMAN, AI))
+        elif number % 2 == 0:
+            play_game(engine, random_move, game, rng, report, (HUMAN,))
+        else:
+            play_game(random_move, engine, game, rng, report, (AI,))
+    return report
+
+def run_selfplay(games, opponent="random", workers=1, size=3, win_length=None,
+                 use_table=True, time_budget=None, seed=0, chunk_size=CHUNK_SIZE):
+    """
+    Plays `games` games spread over `workers` processes and returns the merged report.
+    """
+    chunks = [(min(chunk_size, games - first), first)
+              for first in range(0, games, chunk_size)]
+    args = (opponent, size, win_length, use_table, time_budget, seed)
+
+    report = SelfPlayReport()
+    start = time.perf_counter()
+    if workers <= 1:
+        for count, first in chunks:
+            report.merge(play_games(count, first, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(play_games, count, first, *args) for count, first in chunks]
+            for future in futures:
+                report.merge(future.result())
+    report.seconds = time.perf_counter() - start
+    return report
+
+# Benchmark suite
+# ---------------
+
+BENCHMARKS = [
+    # (name, opponent, use_table)
+    ("AI (table) vs random", "random", True),
+    ("AI (table) vs AI",     "ai",     True),
+    ("AI (search) vs random", "random", False),
+    ("AI (search) vs AI",     "ai",     False),
+]
+
+def run_benchmarks(games, workers=1, seed=0):
+    """
+    Runs every benchmark on the 3x3 board. Returns True if the AI never lost.
+    """
+    never_lost = True
+    for name, opponent, use_table in BENCHMARKS:
+        report = run_selfplay(games, opponent, workers, use_table=use_table, seed=seed)
+        print(f"== {name} ==")
+        print(report.summary())
+        print()
+        never_lost = never_lost and report.ai_losses == 0
+    return never_lost
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description="Headless Tic-Tac-Toe self-play and benchmarks")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--opponent", choices=["random", "ai"], default="random")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes to play games in (default: one per CPU)")
+    parser.add_argument("--size", type=int, default=3, help="board size N for an N x N board")
+    parser.add_argument("--win-length", type=int, help="marks in a row needed to win (default: N)")
+    parser.add_argument("--time-budget", type=float,
+                        help="seconds the AI may think per move on boards bigger than 3x3")
+    parser.add_argument("--no-table", action="store_true",
+                        help="always search instead of using the solved 3x3 table")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--benchmark", action="store_true",
+                        help="run the whole benchmark suite on the 3x3 board")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        ok = run_benchmarks(args.games, args.workers, args.seed)
+    else:
+        report = run_selfplay(args.games, args.opponent, args.workers, args.size, args.win_length,
+                              not args.no_table, args.time_budget, args.seed)
+        print(report.summary())
+        for moves in report.lost_games[:5]:
+            print("AI lost:", " ".join(str(move + 1) for move in moves))
+        ok = report.ai_losses == 0
+
+    # A nonzero exit code lets scripts notice that the AI lost a game
+    sys.exit(0 if ok else 1)
@@ -1,36 +1,102 @@
 import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 # Constants for players
 HUMAN = 'X'
 AI = 'O'
 EMPTY = ' '
 
-def print_board(board):
+# Digits used when a board is written as a base-3 number
+SYMBOL_DIGITS = {EMPTY: 0, HUMAN: 1, AI: 2}
+
+# Board size and win length
+# -------------------------
+# The classic game is 3x3 with three in a row, but any N x N board with K in a
+# row works (for example 4x4 or 15x15 Gomoku with 5 in a row). A Game object
+# holds everything that depends on the size: the winning lines, their bitmasks
+# and the order in which squares are worth trying.
+
+def _mask(squares):
+    mask = 0
+    for square in squares:
+        mask |= 1 << square
+    return mask
+
+class Game:
+    """
+    The rules for an N x N board where K in a row wins.
+    """
+
+    def __init__(self, size=3, win_length=None):
+        win_length = win_length or size
+        if size < 1 or not 1 <= win_length <= size:
+            raise ValueError(f"Cannot get {win_length} in a row on a {size}x{size} board")
+        self.size = size
+        self.win_length = win_length
+        self.cells = size * size
+
+        # Winning combinations (indices): rows, columns, diagonals, anti-diagonals
+        self.win_conditions = []
+        for dr, dc in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+            for row in range(size):
+                for col in range(size):
+                    end_row = row + dr * (win_length - 1)
+                    end_col = col + dc * (win_length - 1)
+                    if 0 <= end_row < size and 0 <= end_col < size:
+                        self.win_conditions.append(
+                            [(row + dr * i) * size + col + dc * i for i in range(win_length)])
+
+        self.win_masks = tuple(_mask(condition) for condition in self.win_conditions)
+        # Only the lines through the last move can have just been completed
+        self.masks_by_square = [tuple(_mask(c) for c in self.win_conditions if square in c)
+                                for square in range(self.cells)]
+        self.full_mask = _mask(range(self.cells))
+        self.not_first_col = _mask(i for i in range(self.cells) if i % size != 0)
+        self.not_last_col = _mask(i for i in range(self.cells) if i % size != size - 1)
+
+        # Squares on more winning lines (and nearer the middle) are tried first:
+        # on 3x3 that is center, corners, edges
+        middle = (size - 1) / 2
+        self.move_priority = sorted(range(self.cells), key=lambda square: (
+            -len(self.masks_by_square[square]),
+            (square // size - middle) ** 2 + (square % size - middle) ** 2,
+            square))
+
+    def is_classic(self):
+        return self.size == 3 and self.win_length == 3
+
+    def nearby(self, bits):
+        """
+        Returns the squares next to (or on) any square in bits, including diagonally.
+        """
+        spread = bits | ((bits << 1) & self.not_first_col) | ((bits >> 1) & self.not_last_col)
+        spread |= (spread << self.size) | (spread >> self.size)
+        return spread & self.full_mask
+
+
+# The game being played; main() replaces it when --size/--win-length are given
+GAME = Game(3, 3)
+
+def print_board(board, game=None):
     """
     Prints the current state of the board in a user-friendly format.
     """
+    size = (game or GAME).size
+    rows = [" " + " | ".join(board[row * size:(row + 1) * size]) + " " for row in range(size)]
     print("\n")
-    print(f" {board[0]} | {board[1]} | {board[2]} ")
-    print("---|---|---")
-    print(f" {board[3]} | {board[4]} | {board[5]} ")
-    print("---|---|---")
-    print(f" {board[6]} | {board[7]} | {board[8]} ")
+    print(("\n" + "|".join(["---"] * size) + "\n").join(rows))
     print("\n")
 
-def check_winner(board, player):
+def check_winner(board, player, game=None):
     """
     Checks if the given player has won the game.
     Returns True if the player has won, False otherwise.
     """
-    # Winning combinations (indices)
-    win_conditions = [
-        [0, 1, 2], [3, 4, 5], [6, 7, 8],  # Rows
-        [0, 3, 6], [1, 4, 7], [2, 5, 8],  # Columns
-        [0, 4, 8], [2, 4, 6]              # Diagonals
-    ]
-    
-    for condition in win_conditions:
-        if all(board[i] == player for i in condition):
+    bits = _mask(i for i, cell in enumerate(board) if cell == player)
+    for mask in (game or GAME).win_masks:
+        if bits & mask == mask:
             return True
     return False
 
@@ -46,81 +112,790 @@ def get_available_moves(board):
     """
     return [i for i, x in enumerate(board) if x == EMPTY]
 
-def minimax(board, depth, is_maximizing):
+# Bitboards
+# ---------
+# For searching, each player's marks are stored as the bits of one integer
+# (bit i is set if the player has a mark on square i). A win is then a single
+# AND against a precomputed mask per winning line, and the free squares are
+# simply the bits that neither player has set.
+
+class Bitboard:
     """
-    The Minimax algorithm.
-    Recursively evaluates all possible moves to find the best score.
-    
+    A board stored as one bitmask per player.
+    Moves are played with make() and taken back with unmake(), so a search
+    can reuse the same object for every position.
+    """
+
+    __slots__ = ("bits", "game")
+
+    def __init__(self, human_bits=0, ai_bits=0, game=None):
+        self.bits = {HUMAN: human_bits, AI: ai_bits}
+        self.game = game or GAME
+
+    @classmethod
+    def from_list(cls, board, game=None):
+        """
+        Builds a Bitboard from the usual list of 'X', 'O' and ' '.
+        """
+        bitboard = cls(game=game)
+        for square, cell in enumerate(board):
+            if cell != EMPTY:
+                bitboard.bits[cell] |= 1 << square
+        return bitboard
+
+    def to_list(self):
+        board = [EMPTY] * self.game.cells
+        for player, bits in self.bits.items():
+            for square in range(self.game.cells):
+                if bits >> square & 1:
+                    board[square] = player
+        return board
+
+    def copy(self):
+        return Bitboard(self.bits[HUMAN], self.bits[AI], self.game)
+
+    def make(self, move, player):
+        self.bits[player] |= 1 << move
+
+    def unmake(self, move, player):
+        self.bits[player] ^= 1 << move
+
+    def has_won(self, player, last_move=None):
+        """
+        Checks every winning line, or only those through last_move if given.
+        """
+        bits = self.bits[player]
+        masks = self.game.win_masks if last_move is None else self.game.masks_by_square[last_move]
+        for mask in masks:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def is_full(self):
+        return self.bits[HUMAN] | self.bits[AI] == self.game.full_mask
+
+    def marks(self):
+        """
+        Returns how many marks are on the board.
+        """
+        return (self.bits[HUMAN] | self.bits[AI]).bit_count()
+
+    def empty_mask(self):
+        return self.game.full_mask & ~(self.bits[HUMAN] | self.bits[AI])
+
+    def moves(self):
+        """
+        Yields the free squares from lowest to highest, like get_available_moves().
+        """
+        empty = self.empty_mask()
+        while empty:
+            lowest = empty & -empty
+            yield lowest.bit_length() - 1
+            empty ^= lowest
+
+# Transposition table
+# -------------------
+# The same position is often reached through different move orders, and a
+# rotated or mirrored board is just as good (or bad) as the original. So the
+# score of every searched position is remembered under a "canonical" key: the
+# smallest base-3 number among the board's 8 rotations and reflections.
+
+def board_symmetries(size):
+    """
+    Returns the 8 rotations/reflections of a size x size board, each as a list
+    that maps a position in the transformed board to a position in the original.
+    """
+    def index(row, col):
+        return row * size + col
+
+    last = size - 1
+    transforms = [
+        lambda r, c: (r, c),                  # Identity
+        lambda r, c: (last - c, r),           # Rotate 90
+        lambda r, c: (last - r, last - c),    # Rotate 180
+        lambda r, c: (c, last - r),           # Rotate 270
+        lambda r, c: (r, last - c),           # Mirror left-right
+        lambda r, c: (last - r, c),           # Mirror top-bottom
+        lambda r, c: (c, r),                  # Main diagonal
+        lambda r, c: (last - c, last - r),    # Anti-diagonal
+    ]
+    return [[index(*transform(r, c)) for r in range(size) for c in range(size)]
+            for transform in transforms]
+
+class TranspositionTable:
+    """
+    Caches search results under a symmetry-independent key.
+    Works for any square board size.
+    """
+
+    def __init__(self, size=3, max_entries=1_000_000):
+        self.symmetries = board_symmetries(size)
+        # inverses[s][square] is where `square` ends up after symmetry s
+        self.inverses = []
+        for symmetry in self.symmetries:
+            inverse = [0] * len(symmetry)
+            for position, square in enumerate(symmetry):
+                inverse[square] = position
+            self.inverses.append(inverse)
+        # weights[s][square] is what a mark on `square` adds to the base-3
+        # code of the board after symmetry s (an X adds it once, an O twice)
+        cells = size * size
+        self.weights = []
+        for symmetry in self.symmetries:
+            weights = [0] * cells
+            for position, square in enumerate(symmetry):
+                weights[square] = 3 ** (cells - 1 - position)
+            self.weights.append(weights)
+        self.max_entries = max_entries
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, bitboard, to_move):
+        """
+        Returns the canonical key of a Bitboard (or a board list) and the side to move.
+        """
+        return self.lookup(bitboard, to_move)[0]
+
+    def lookup(self, bitboard, to_move):
+        """
+        Returns (key, symmetry): the canonical key and the index of the
+        symmetry that produced it. Moves stored in the table are kept in
+        canonical coordinates; use to_canonical()/from_canonical() to convert.
+        """
+        if not isinstance(bitboard, Bitboard):
+            bitboard = Bitboard.from_list(bitboard)
+        human_bits = bitboard.bits[HUMAN]
+        ai_bits = bitboard.bits[AI]
+
+        canonical = None
+        chosen = 0
+        for index, weights in enumerate(self.weights):
+            code = 0
+            bits = human_bits
+            while bits:
+                lowest = bits & -bits
+                code += weights[lowest.bit_length() - 1]
+                bits ^= lowest
+            bits = ai_bits
+            while bits:
+                lowest = bits & -bits
+                code += 2 * weights[lowest.bit_length() - 1]
+                bits ^= lowest
+            if canonical is None or code < canonical:
+                canonical = code
+                chosen = index
+        return (canonical, to_move), chosen
+
+    def to_canonical(self, move, symmetry):
+        return None if move is None else self.inverses[symmetry][move]
+
+    def from_canonical(self, move, symmetry):
+        return None if move is None else self.symmetries[symmetry][move]
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def store(self, key, entry):
+        if len(self.entries) >= self.max_entries:
+            self.entries.clear()   # Simple way to bound memory on big boards
+        self.entries[key] = entry
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# One table per game, shared between moves: a position's score never changes
+_shared_tables = {}
+
+def shared_table(game=None):
+    game = game or GAME
+    key = (game.size, game.win_length)
+    if key not in _shared_tables:
+        _shared_tables[key] = TranspositionTable(game.size)
+    return _shared_tables[key]
+
+# Alpha-beta search
+# -----------------
+# Negamax is Minimax written from the point of view of the player to move:
+# a position's score for one player is minus its score for the other.
+# Alpha-beta pruning skips moves that cannot change the result, and trying the
+# most promising moves first (the best move found earlier, then center, corners
+# and edges, then moves that caused cut-offs elsewhere) makes those skips happen early.
+#
+# Scores depend on how quickly the game ends: a win with fewer marks on the
+# board scores higher, so the AI wins as fast as it can and, when it cannot
+# avoid losing, loses as slowly as possible.
+#
+# Boards bigger than 3x3 are too big to search to the end. There the search
+# stops at a given depth and guesses the score by counting open lines, and
+# iterative deepening searches depth 1, 2, 3, ... until time runs out, always
+# keeping the move from the last depth it finished. Each depth starts with the
+# best moves stored in the transposition table by the previous one.
+
+WIN_SCORE = 1_000_000           # Win score on an empty board; one less per mark placed
+WIN_THRESHOLD = WIN_SCORE // 2  # Any score beyond this is a certain win or loss
+EXACT, LOWER, UPPER = 0, 1, 2   # Kind of score stored in the transposition table
+AI_TIME_BUDGET = 2.0            # Seconds the AI may think on boards bigger than 3x3
+
+def _other(player):
+    return HUMAN if player == AI else AI
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when its time budget runs out.
+    """
+
+def evaluate(bitboard, player):
+    """
+    Guesses the score of an unfinished position for `player`.
+    Every line that only one player has marks on counts for that player,
+    ten times more for each extra mark on it.
+    """
+    mine = bitboard.bits[player]
+    theirs = bitboard.bits[_other(player)]
+    score = 0
+    for mask in bitboard.game.win_masks:
+        own = mine & mask
+        other = theirs & mask
+        if own and not other:
+            score += 10 ** (own.bit_count() - 1)
+        elif other and not own:
+            score -= 10 ** (other.bit_count() - 1)
+    return max(-WIN_THRESHOLD + 1, min(WIN_THRESHOLD - 1, score))
+
+class AlphaBetaSearch:
+    """
+    Negamax search with alpha-beta pruning, a transposition table and
+    killer/history move ordering. `nodes` counts the positions visited.
+    """
+
+    def __init__(self, table=None, game=None):
+        self.game = game or GAME
+        self.table = table if table is not None else TranspositionTable(self.game.size)
+        self.nodes = 0
+        self.deadline = None
+        self.killers = [None] * (self.game.cells + 1)   # Per ply: last move that caused a cut-off
+        self.history = [0] * self.game.cells            # Per square: how often it caused cut-offs
+
+    def _ordered_moves(self, bitboard, ply, first=None):
+        game = self.game
+        candidates = bitboard.empty_mask()
+        occupied = game.full_mask & ~candidates
+        if game.cells > 9 and occupied:
+            # On big boards only squares next to existing marks are worth trying
+            candidates &= game.nearby(occupied)
+
+        moves = [square for square in game.move_priority if candidates >> square & 1]
+        if ply:
+            moves.sort(key=lambda square: -self.history[square])
+            killer = self.killers[ply]
+            if killer in moves:
+                moves.remove(killer)
+                moves.insert(0, killer)
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def negamax(self, bitboard, player, alpha, beta, ply=0, depth=None, last_move=None):
+        """
+        Returns the score of the position for `player`, who is to move.
+        depth is how many more moves to look ahead (None = to the end of the game).
+        """
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        opponent = _other(player)
+
+        # Base cases: only the player who just moved can have won
+        if bitboard.has_won(opponent, last_move):
+            return -(WIN_SCORE - bitboard.marks())
+        if bitboard.is_full():
+            return 0
+        # Looking further ahead than the moves left changes nothing
+        empties = bitboard.empty_mask().bit_count()
+        if depth is None or depth > empties:
+            depth = empties
+        if depth <= 0:
+            return evaluate(bitboard, player)
+
+        key, symmetry = self.table.lookup(bitboard, player)
+        entry = self.table.get(key)
+        table_move = None
+        if entry is not None:
+            score, kind, entry_depth, canonical_move = entry
+            table_move = self.table.from_canonical(canonical_move, symmetry)
+            # Only scores searched to exactly this depth are reused, so a
+            # position always gets the same score however it was reached
+            # (this keeps serial and parallel searches in agreement)
+            if entry_depth == depth:
+                if kind == EXACT:
+                    return score
+                if kind == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+
+        original_alpha = alpha
+        best_score = -math.inf
+        best_move = None
+        for move in self._ordered_moves(bitboard, ply, table_move):
+            bitboard.make(move, player)
+            score = -self.negamax(bitboard, opponent, -beta, -alpha, ply + 1, depth - 1, move)
+            bitboard.unmake(move, player) # Undo move
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                # Remember moves that refute the opponent's play
+                self.killers[ply] = move
+                self.history[move] += depth * depth
+                break
+
+        if best_score <= original_alpha:
+            kind = UPPER
+        elif best_score >= beta:
+            kind = LOWER
+        else:
+            kind = EXACT
+        self.table.store(key, (best_score, kind, depth, self.table.to_canonical(best_move, symmetry)))
+        return best_score
+
+    def best_move(self, bitboard, player, depth=None, first=None):
+        """
+        Returns (move, score) for the player to move, looking `depth` moves
+        ahead (None = to the end of the game). Moves are tried center first
+        (or `first` first), and among equally good moves the first one tried is kept.
+        """
+        opponent = _other(player)
+        best_move = None
+        alpha = -math.inf
+        if depth is None:
+            depth = bitboard.empty_mask().bit_count()
+
+        for move in self._ordered_moves(bitboard, 0, first):
+            bitboard.make(move, player)
+            try:
+                score = -self.negamax(bitboard, opponent, -math.inf, -alpha, 1, depth - 1, move)
+            finally:
+                bitboard.unmake(move, player) # Undo move, even if time ran out
+
+            if best_move is None or score > alpha:
+                alpha = score
+                best_move = move
+
+        return best_move, alpha
+
+    def iterative_deepening(self, bitboard, player, time_budget=None, max_depth=None):
+        """
+        Searches depth 1, 2, 3, ... until the game is solved, max_depth is
+        reached or time_budget seconds have passed.
+        Returns (move, score, depth) from the deepest search that finished.
+        """
+        self.deadline = None if time_budget is None else time.perf_counter() + time_budget
+        remaining = bitboard.empty_mask().bit_count()
+        max_depth = remaining if max_depth is None else min(max_depth, remaining)
+
+        # If not even depth 1 finishes in time, any sensible move will do
+        moves = self._ordered_moves(bitboard, 0)
+        result = (moves[0] if moves else None, 0, 0)
+
+        try:
+            for depth in range(1, max_depth + 1):
+                move, score = self.best_move(bitboard, player, depth, first=result[0])
+                result = (move, score, depth)
+                if abs(score) > WIN_THRESHOLD:
+                    break   # A forced win or loss was found; looking deeper won't change it
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+        return result
+
+# Parallel search
+# ---------------
+# The moves at the root of the search can be scored independently, so they are
+# spread over a pool of worker processes ("Young Brothers Wait"): the first
+# (most promising) move is searched here to get a good bound, then all its
+# brothers are searched at the same time with that bound. Each worker keeps its
+# own transposition table between calls; sharing one table between processes
+# would cost more than it saves. Scores do not depend on search order, so the
+# chosen move is always the same as the serial search's.
+
+AI_WORKERS = 1    # Worker processes used by ai_move(); 1 means search serially
+
+_worker_searches = {}   # Inside a worker: (size, win_length) -> AlphaBetaSearch
+
+def _score_root_move(size, win_length, human_bits, ai_bits, player, move, depth, alpha, deadline):
+    """
+    Runs in a worker process. Returns the score of playing `move`, or None
+    if the deadline passed first. The deadline is a time.time() value: unlike
+    time.perf_counter(), it means the same moment in every process.
+    """
+    # A task that waited in the queue past its deadline belongs to a search
+    # that has already given up; drop it so it does not delay the next one
+    time_left = None if deadline is None else deadline - time.time()
+    if time_left is not None and time_left <= 0:
+        return None
+
+    key = (size, win_length)
+    if key not in _worker_searches:
+        game = Game(size, win_length)
+        _worker_searches[key] = AlphaBetaSearch(TranspositionTable(size), game)
+    search = _worker_searches[key]
+
+    bitboard = Bitboard(human_bits, ai_bits, search.game)
+    bitboard.make(move, player)
+    search.deadline = None if time_left is None else time.perf_counter() + time_left
+    try:
+        return -search.negamax(bitboard, _other(player), -math.inf, -alpha, 1, depth - 1, move)
+    except SearchTimeout:
+        return None
+    finally:
+        search.deadline = None
+
+class ParallelSearch:
+    """
+    Alpha-beta search that scores root moves in parallel worker processes.
+    Use it as a context manager (or call close()) to shut the workers down.
+    """
+
+    def __init__(self, workers, game=None, table=None):
+        self.game = game or GAME
+        self.workers = workers
+        self.serial = AlphaBetaSearch(table, self.game)
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def best_move(self, bitboard, player, depth=None, first=None, deadline=None):
+        """
+        Returns (move, score) like AlphaBetaSearch.best_move().
+        Raises SearchTimeout if the deadline (a time.perf_counter() value) passes.
+        """
+        empties = bitboard.empty_mask().bit_count()
+        depth = empties if depth is None else min(depth, empties)
+        moves = self.serial._ordered_moves(bitboard, 0, first)
+        opponent = _other(player)
+
+        # The eldest brother is searched here to get a bound for the others
+        eldest = moves[0]
+        bitboard.make(eldest, player)
+        self.serial.deadline = deadline
+        try:
+            best_score = -self.serial.negamax(bitboard, opponent, -math.inf, math.inf, 1, depth - 1, eldest)
+        finally:
+            self.serial.deadline = None
+            bitboard.unmake(eldest, player)
+        best_move = eldest
+
+        # Workers get the deadline as wall-clock time, so tasks that wait in
+        # the queue do not get a fresh time budget when they start
+        wall_deadline = None if deadline is None else time.time() + (deadline - time.perf_counter())
+        futures = [self.pool.submit(_score_root_move, self.game.size, self.game.win_length,
+                                    bitboard.bits[HUMAN], bitboard.bits[AI], player,
+                                    move, depth, best_score, wall_deadline)
+                   for move in moves[1:]]
+
+        # Collect in move order so ties go to the same move as in the serial search
+        for move, future in zip(moves[1:], futures):
+            score = future.result()
+            if score is None:
+                for other in futures:
+                    other.cancel()
+                raise SearchTimeout()
+            if score > best_score:
+                best_score = score
+                best_move = move
+
+        return best_move, best_score
+
+    def iterative_deepening(self, bitboard, player, time_budget=None, max_depth=None):
+        """
+        Same as AlphaBetaSearch.iterative_deepening(), with each depth searched in parallel.
+        """
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        remaining = bitboard.empty_mask().bit_count()
+        max_depth = remaining if max_depth is None else min(max_depth, remaining)
+
+        moves = self.serial._ordered_moves(bitboard, 0)
+        result = (moves[0] if moves else None, 0, 0)
+
+        try:
+            for depth in range(1, max_depth + 1):
+                move, score = self.best_move(bitboard, player, depth, result[0], deadline)
+                result = (move, score, depth)
+                if abs(score) > WIN_THRESHOLD:
+                    break
+        except SearchTimeout:
+            pass
+        return result
+
+
+_parallel_searches = {}   # (size, win_length, workers) -> ParallelSearch kept between moves
+
+def parallel_search(game=None, workers=None):
+    game = game or GAME
+    workers = workers or AI_WORKERS
+    key = (game.size, game.win_length, workers)
+    if key not in _parallel_searches:
+        _parallel_searches[key] = ParallelSearch(workers, game, shared_table(game))
+    return _parallel_searches[key]
+
+def benchmark_parallel(game=None, depth=6, worker_counts=(1, 2, 4, 8), marks=2):
+    """
+    Times a fixed-depth search from a few opening positions with different
+    numbers of workers, and checks that every run picks the serial search's move.
+    Returns a list of (workers, seconds, speedup, same_moves).
+    """
+    game = game or Game(6, 4)
+    positions = []
+    middle = game.move_priority
+    for offset in range(3):
+        board = [EMPTY] * game.cells
+        for turn in range(marks):
+            board[middle[offset + turn * 2]] = HUMAN if turn % 2 == 0 else AI
+        positions.append(board)
+
+    results = []
+    serial_moves = None
+    serial_seconds = None
+    for workers in worker_counts:
+        if workers <= 1:
+            searcher = AlphaBetaSearch(TranspositionTable(game.size), game)
+        else:
+            searcher = ParallelSearch(workers, game, TranspositionTable(game.size))
+            # Start the worker processes before timing
+            list(searcher.pool.map(abs, range(workers)))
+
+        start = time.perf_counter()
+        moves = [searcher.best_move(Bitboard.from_list(board, game), AI, depth)[0]
+                 for board in positions]
+        seconds = time.perf_counter() - start
+        if workers > 1:
+            searcher.close()
+
+        if serial_moves is None:
+            serial_moves, serial_seconds = moves, seconds
+        results.append((workers, seconds, serial_seconds / seconds, moves == serial_moves))
+    return results
+
+def minimax(board, depth, is_maximizing, table=None):
+    """
+    Scores the board for the AI with alpha-beta search.
+    `depth` is kept for compatibility: the number of marks on the
+    board already tells how far into the game we are.
+
     Scores:
-    AI wins: +1
-    Human wins: -1
+    AI wins: positive (higher = sooner)
+    Human wins: negative (lower = sooner)
     Draw: 0
     """
-    
-    # Base cases: check for terminal states
-    if check_winner(board, AI):
-        return 1
-    if check_winner(board, HUMAN):
-        return -1
-    if is_board_full(board):
-        return 0
-    
-    if is_maximizing:
-        best_score = -math.inf
+    bitboard = Bitboard.from_list(board)
+    if bitboard.has_won(AI):
+        return WIN_SCORE - bitboard.marks()
+    if bitboard.has_won(HUMAN):
+        return -(WIN_SCORE - bitboard.marks())
+
+    player = AI if is_maximizing else HUMAN
+    score = AlphaBetaSearch(table).negamax(bitboard, player, -math.inf, math.inf)
+    return score if is_maximizing else -score
+
+# Solved game table
+# -----------------
+# A 3x3 game has only a few thousand legal positions, so we can solve all of
+# them once and save the answers. Every board is turned into a number by
+# reading it as a base-3 number (empty = 0, X = 1, O = 2), which gives an index
+# into a table of 3^9 = 19,683 bytes. For positions where the AI is to move,
+# each byte stores the best move (low 4 bits, move + 1) and the outcome with
+# best play (bits 4-5: 0 = loss, 1 = draw, 2 = win). A zero byte means "no entry".
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solved_3x3.bin")
+TABLE_SIZE = 3 ** 9
+
+def board_code(board):
+    """
+    Converts a board into its base-3 number.
+    """
+    code = 0
+    for cell in reversed(board):
+        code = code * 3 + SYMBOL_DIGITS[cell]
+    return code
+
+def build_solved_table():
+    """
+    Solves every reachable position (with either player starting) and
+    returns the table as bytes. Moves come from the same search that
+    ai_move() uses, so the table and the search always agree.
+    """
+    classic = Game(3, 3)
+    table = bytearray(TABLE_SIZE)
+    search = AlphaBetaSearch(TranspositionTable(3), classic)
+    seen = set()
+
+    def visit(board, ai_to_move):
+        code = board_code(board)
+        if (code, ai_to_move) in seen:
+            return
+        seen.add((code, ai_to_move))
+        if check_winner(board, AI, classic) or check_winner(board, HUMAN, classic) or is_board_full(board):
+            return
+
+        if ai_to_move:
+            move, score = search.best_move(Bitboard.from_list(board, classic), AI)
+            outcome = (score > 0) - (score < 0)
+            table[code] = (move + 1) | ((outcome + 1) << 4)
+
+        player = AI if ai_to_move else HUMAN
         for move in get_available_moves(board):
-            board[move] = AI
-            score = minimax(board, depth + 1, False)
-            board[move] = EMPTY # Undo move
-            best_score = max(score, best_score)
-        return best_score
+            board[move] = player
+            visit(board, not ai_to_move)
+            board[move] = EMPTY
+
+    visit([EMPTY] * 9, True)    # AI starts
+    visit([EMPTY] * 9, False)   # Human starts
+    return bytes(table)
+
+def save_solved_table(path=TABLE_PATH):
+    table = build_solved_table()
+    with open(path, "wb") as f:
+        f.write(table)
+    return table
+
+def load_solved_table(path=TABLE_PATH):
+    """
+    Returns the solved table, or None if the file is missing or damaged.
+    """
+    try:
+        with open(path, "rb") as f:
+            table = f.read()
+    except OSError:
+        return None
+    return table if len(table) == TABLE_SIZE else None
+
+
+# Loaded once; ai_move() falls back to searching if it is not available
+SOLVED_TABLE = load_solved_table()
+
+def table_move(board, game=None):
+    """
+    Looks up the AI's best move in the solved table. Returns None if unknown.
+    """
+    if SOLVED_TABLE is None or not (game or GAME).is_classic() or len(board) != 9:
+        return None
+    entry = SOLVED_TABLE[board_code(board)]
+    if not entry:
+        return None
+    move = (entry & 0x0F) - 1
+    return move if board[move] == EMPTY else None
+
+def _run_search(search, bitboard, game, time_budget):
+    """
+    Runs `search` for the AI on `bitboard` and returns the chosen move.
+    """
+    if game.cells <= 9:
+        move, score = search.best_move(bitboard, AI)
+    elif bitboard.marks() == 0:
+        move = game.move_priority[0]   # Open in the middle of an empty big board
     else:
-        best_score = math.inf
-        for move in get_available_moves(board):
-            board[move] = HUMAN
-            score = minimax(board, depth + 1, True)
-            board[move] = EMPTY # Undo move
-            best_score = min(score, best_score)
-        return best_score
+        if time_budget is None:
+            time_budget = AI_TIME_BUDGET
+        move, score, depth = search.iterative_deepening(bitboard, AI, time_budget)
+    return move
 
-def ai_move(board):
+def search_move(board, game=None, time_budget=None, workers=None):
     """
-    Determines the best move for the AI using Minimax.
+    Determines the best move for the AI with alpha-beta search.
+    Boards up to 3x3 are searched to the end; bigger boards use iterative
+    deepening and return within time_budget seconds (default AI_TIME_BUDGET).
+    With more than one worker (default AI_WORKERS) root moves are searched in parallel.
+    Scores are cached in the game's shared transposition table.
     """
-    best_score = -math.inf
-    best_move = None
-    
-    # If it's the very first move, take the center or a corner to save computation time
-    # (Optional optimization, but Minimax on 3x3 is fast enough)
-    
-    print("AI is thinking...")
-    
-    for move in get_available_moves(board):
-        board[move] = AI
-        score = minimax(board, 0, False)
-        board[move] = EMPTY # Undo move
-        
-        if score > best_score:
-            best_score = score
-            best_move = move
-            
-    return best_move
+    game = game or GAME
+    bitboard = Bitboard.from_list(board, game)
+    workers = workers or AI_WORKERS
+    if workers > 1:
+        search = parallel_search(game, workers)
+    else:
+        search = AlphaBetaSearch(shared_table(game), game)
+    return _run_search(search, bitboard, game, time_budget)
 
-def human_move(board):
+def ai_move(board, game=None, quiet=False):
+    """
+    Determines the best move for the AI.
+    Uses the solved table when it is available, otherwise alpha-beta search.
+    Pass quiet=True to skip the "thinking" message.
+    """
+    move = table_move(board, game)
+    if move is not None:
+        return move
+
+    if not quiet:
+        print("AI is thinking...")
+    return search_move(board, game)
+
+def choose_move(board, player=AI, game=None, use_table=True, time_budget=None):
+    """
+    Headless engine API: returns (move, nodes) for `player` to move on `board`.
+    Never prints, and the AI can play either side. nodes is the number of
+    positions searched (0 when the move came from the solved table).
+    """
+    game = game or GAME
+    if player == HUMAN:
+        # The engine always plays as AI, so swap the marks to play as HUMAN
+        swap = {HUMAN: AI, AI: HUMAN, EMPTY: EMPTY}
+        board = [swap[cell] for cell in board]
+
+    if use_table:
+        move = table_move(board, game)
+        if move is not None:
+            return move, 0
+
+    search = AlphaBetaSearch(shared_table(game), game)
+    move = _run_search(search, Bitboard.from_list(board, game), game, time_budget)
+    return move, search.nodes
+
+def human_move(board, game=None):
     """
     Prompts the human player for their move.
     """
+    cells = (game or GAME).cells
     while True:
         try:
-            move = input("Enter your move (1-9): ")
-            move = int(move) - 1 # Convert 1-9 to 0-8 index
+            move = input(f"Enter your move (1-{cells}): ")
+            move = int(move) - 1 # Convert 1-N to 0-(N-1) index
             
-            if 0 <= move <= 8:
+            if 0 <= move < cells:
                 if board[move] == EMPTY:
                     return move
                 else:
                     print("That spot is already taken. Try again.")
             else:
-                print("Invalid input. Please enter a number between 1 and 9.")
+                print(f"Invalid input. Please enter a number between 1 and {cells}.")
         except ValueError:
             print("Invalid input. Please enter a number.")
 
@@ -132,9 +907,11 @@ def main():
     print("       UNBEATABLE TIC-TAC-TOE AI       ")
     print("=======================================")
     print("You are X. The AI is O.")
-    print("Positions are numbered 1-9 starting from top-left.")
+    print(f"Positions are numbered 1-{GAME.cells} starting from top-left.")
+    if not GAME.is_classic():
+        print(f"Get {GAME.win_length} in a row on the {GAME.size}x{GAME.size} board to win.")
     
-    board = [EMPTY] * 9
+    board = [EMPTY] * GAME.cells
     
     # Ask who goes first
     while True:
@@ -168,4 +945,30 @@ def main():
         human_turn = not human_turn # Switch turns
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Unbeatable Tic-Tac-Toe AI")
+    parser.add_argument("--size", type=int, default=3, help="board size N for an N x N board")
+    parser.add_argument("--win-length", type=int, help="marks in a row needed to win (default: N)")
+    parser.add_argument("--time-budget", type=float, default=AI_TIME_BUDGET,
+                        help="seconds the AI may think per move on boards bigger than 3x3")
+    parser.add_argument("--workers", type=int, default=AI_WORKERS,
+                        help="worker processes for the AI's search")
+    parser.add_argument("--build-table", action="store_true",
+                        help="solve every 3x3 position and save the table")
+    parser.add_argument("--benchmark-parallel", action="store_true",
+                        help="measure the parallel search speedup with 1, 2, 4 and 8 workers")
+    args = parser.parse_args()
+
+    if args.build_table:
+        save_solved_table()
+        print(f"Solved table written to {TABLE_PATH}")
+    elif args.benchmark_parallel:
+        print("Workers | Seconds | Speedup | Same move as serial")
+        for workers, seconds, speedup, same in benchmark_parallel():
+            print(f"{workers:7} | {seconds:7.2f} | {speedup:6.2f}x | {'yes' if same else 'NO'}")
+    else:
+        GAME = Game(args.size, args.win_length)
+        AI_TIME_BUDGET = args.time_budget
+        AI_WORKERS = args.workers
+        main()